@@ -0,0 +1,202 @@
+"""
+Shared helpers for the Bronze Raw ingesters
+
+Chunking, output paths, file reuse, JSON writing and the HTTP client live
+here so the ingesters apply each of them the same way.
+"""
+
+import time
+import threading
+from datetime import datetime, timedelta, timezone
+from dateutil.relativedelta import relativedelta
+from pathlib import Path
+from typing import Dict, List, Set, Union
+import httpx
+import orjson
+from config import BRONZE_RAW_DIR, require_edr_key
+
+
+# Monthly chunks fetched concurrently; the requests are network-bound
+MAX_WORKERS = 8
+
+# Buffer for Bronze Raw file writes (1 MiB)
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Existing outputs are reused instead of re-querying the API: files for
+# completed months indefinitely, the current month's only while younger than this
+REUSE_TTL = timedelta(days=7)
+
+# Coverage JSON compresses well; brotli is advertised only when the optional
+# brotli package is installed (httpx needs it to decode br)
+try:
+    import brotli  # noqa: F401
+    ACCEPT_ENCODING = "br, gzip, deflate"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# HTTP/2 needs the optional h2 package (httpx[http2]); without it httpx
+# stays on HTTP/1.1
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+
+def utc_timestamp() -> str:
+    """Current UTC time as an ISO 8601 string with a Z suffix"""
+    return datetime.now(timezone.utc).isoformat(timespec='seconds').replace('+00:00', 'Z')
+
+
+class RateLimiter:
+    """Spaces calls at least 1/rate seconds apart across threads"""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self.next_allowed = time.monotonic()
+        self.lock = threading.Lock()
+
+    def wait(self):
+        with self.lock:
+            now = time.monotonic()
+            delay = self.next_allowed - now
+            self.next_allowed = max(now, self.next_allowed) + self.interval
+        if delay > 0:
+            time.sleep(delay)
+
+
+def create_client(timeout: float = 120) -> httpx.Client:
+    """
+    HTTP client for the EDR API, shared by all chunk threads
+
+    Over HTTP/2 the concurrent requests multiplex on a single TLS connection.
+    """
+    return httpx.Client(
+        http2=HTTP2_AVAILABLE,
+        headers={
+            "Authorization": require_edr_key(),
+            "Accept-Encoding": ACCEPT_ENCODING
+        },
+        limits=httpx.Limits(max_connections=MAX_WORKERS, max_keepalive_connections=MAX_WORKERS),
+        timeout=timeout
+    )
+
+
+def generate_monthly_chunks(
+    start_date: Union[str, datetime],
+    end_date: Union[str, datetime],
+    chunk_months: int = 1
+) -> List[Dict]:
+    """
+    Generate monthly date ranges to avoid API limits
+
+    Args:
+        start_date: Start date as datetime or ISO string
+        end_date: End date as datetime or ISO string
+        chunk_months: Months per request window (clipped at year ends)
+
+    Returns:
+        List of chunk dictionaries with ISO start/end, month label, months
+        and the parsed start_dt/end_dt
+    """
+    # Config ranges arrive pre-parsed; only custom ISO strings need parsing
+    start = start_date
+    if isinstance(start, str):
+        start = datetime.fromisoformat(start.replace('Z', '+00:00'))
+    end = end_date
+    if isinstance(end, str):
+        end = datetime.fromisoformat(end.replace('Z', '+00:00'))
+
+    # Dates given without a zone (e.g. "2024-01-01") are taken as UTC, so
+    # chunk bounds compare with the aware timestamps used for file reuse
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=timezone.utc)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=timezone.utc)
+
+    chunks = []
+    current = start
+
+    while current < end:
+        # Start of the next window: midnight on day 1, chunk_months ahead; windows
+        # never cross a year boundary so each file stays inside its year= partition
+        month_start = relativedelta(day=1, hour=0, minute=0, second=0, microsecond=0)
+        next_start = min(
+            current + relativedelta(months=chunk_months) + month_start,
+            current + relativedelta(years=1, month=1) + month_start
+        )
+
+        # Don't exceed overall end date
+        chunk_end = min(next_start - timedelta(seconds=1), end)
+
+        first_month = current.strftime("%Y-%m")
+        last_month = chunk_end.strftime("%Y-%m")
+        chunks.append({
+            "start": current.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "end": chunk_end.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "month": first_month if first_month == last_month else f"{first_month}..{last_month}",
+            "months": (chunk_end.year - current.year) * 12 + chunk_end.month - current.month + 1,
+            "start_dt": current,
+            "end_dt": chunk_end
+        })
+
+        current = next_start
+
+    return chunks
+
+
+def build_output_path(
+    station_dir: str,
+    start: datetime,
+    end: datetime,
+    ensured_dirs: Set[Path],
+    base_dir: Path = BRONZE_RAW_DIR
+) -> Path:
+    """
+    Generate output path for raw JSON file
+
+    Args:
+        station_dir: Partition directory name of the station (e.g., "0_20000_0_06283")
+        start: Start of the chunk
+        end: End of the chunk
+        ensured_dirs: Directories already created; updated in place
+        base_dir: Bronze Raw root directory
+
+    Returns:
+        Path object for output file
+    """
+    # Create directory structure: bronze/raw/edr_api/station_id/year/
+    output_dir = base_dir / "edr_api" / f"station_id={station_dir}" / f"year={start.year}"
+    if output_dir not in ensured_dirs:
+        output_dir.mkdir(parents=True, exist_ok=True)
+        ensured_dirs.add(output_dir)
+
+    # Filename includes date range
+    filename = f"{start.strftime('%Y%m%d')}_to_{end.strftime('%Y%m%d')}.json"
+    return output_dir / filename
+
+
+def is_reusable(output_path: Path, end: datetime) -> bool:
+    """Check whether an existing output file can be reused for a chunk ending at end"""
+    try:
+        mtime = output_path.stat().st_mtime
+    except FileNotFoundError:
+        return False
+
+    # Completed months no longer change; the current month goes stale after REUSE_TTL
+    now = datetime.now(timezone.utc)
+    if end < now.replace(day=1, hour=0, minute=0, second=0, microsecond=0):
+        return True
+    return now - datetime.fromtimestamp(mtime, timezone.utc) < REUSE_TTL
+
+
+def write_bronze_json(output_path: Path, metadata: Dict, data: Dict, pretty: bool = False):
+    """
+    Write a Bronze Raw file: {"_metadata": ..., "data": ...}
+
+    Compact JSON by default: Bronze Raw is machine-read, and indenting
+    roughly doubles file size and encode time.
+    """
+    option = orjson.OPT_INDENT_2 if pretty else 0
+    with open(output_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+        f.write(orjson.dumps({"_metadata": metadata, "data": data}, option=option))
@@ -22,83 +22,120 @@ Usage:
 """
 
 import os
-import json
 import argparse
-from datetime import datetime, timedelta
+import threading
+from datetime import datetime
 from pathlib import Path
-import requests
-import time
-from typing import List, Dict, Optional, Tuple
+import orjson
+import httpx
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Dict, Optional, Sequence, Tuple, Union
 from config import (
-    EDR_API_KEY, EDR_BASE_URL, EDR_COLLECTION,
-    BRONZE_RAW_DIR, STATIONS, DATE_RANGES, EDR_PARAMETERS
+    EDR_BASE_URL, EDR_COLLECTION,
+    BRONZE_RAW_DIR, STATIONS, DATE_RANGES, DATE_RANGES_PARSED, EDR_PARAMETERS,
+    RATE_LIMIT_REQUESTS
+)
+from bronze_common import (
+    MAX_WORKERS, WRITE_BUFFER_SIZE, RateLimiter, build_output_path,
+    create_client, generate_monthly_chunks, is_reusable, utc_timestamp,
+    write_bronze_json
 )
 
 
 class BronzeRawIngesterV2:
     """Handles ingestion from EDR API to Bronze Raw layer with multi-station support"""
 
-    def __init__(self, station_keys: List[str]):
+    def __init__(self, station_keys: List[str], pretty: bool = False, force_refresh: bool = False):
         """
         Initialize ingester for one or more stations
 
         Args:
             station_keys: List of station keys (e.g., ["hupsel", "deelen"])
+            pretty: Write indented JSON instead of compact JSON
+            force_refresh: Query the API even when output files already exist
         """
-        self.station_keys = station_keys
-        self.station_configs = {key: STATIONS[key] for key in station_keys}
-        self.station_ids = [STATIONS[key]["id"] for key in station_keys]
-        self.headers = {"Authorization": EDR_API_KEY}
+        self.station_keys = tuple(station_keys)
+        self.pretty = pretty
+        self.force_refresh = force_refresh
+        self.ingestion_timestamp = None  # Shared by all files of one ingest() run
+        self.station_configs = {key: STATIONS[key] for key in self.station_keys}
+        self.station_ids = tuple(cfg["id"] for cfg in self.station_configs.values())
+
+        # Location path segment for the batch, joined once instead of per chunk
+        self.location_param = ",".join(self.station_ids)
+
+        # Reverse lookups for matching API station IDs back to our config
+        self.id_to_key = {cfg["id"]: key for key, cfg in self.station_configs.items()}
+        self.id_to_name = {cfg["id"]: cfg["name"] for cfg in self.station_configs.values()}
+
+        # Partition directory names per station, and directories already created
+        self.station_dirs = {key: cfg["id"].replace('-', '_') for key, cfg in self.station_configs.items()}
+        self._ensured_dirs = set()
+
+        # One client shared by all chunk threads
+        self.client = create_client(timeout=120)
+        self._encoding_logged = False
+        self.rate_limiter = RateLimiter(RATE_LIMIT_REQUESTS)
+
+        # Per-thread output buffer, so concurrent chunks don't interleave lines
+        self._chunk_output = threading.local()
+
+    def close(self):
+        """Close the pooled HTTP connections"""
+        self.client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _log(self, message: str):
+        """Print a line, or buffer it while this thread is processing a chunk"""
+        lines = getattr(self._chunk_output, "lines", None)
+        if lines is None:
+            print(message)
+        else:
+            lines.append(message)
 
-    def get_output_path(self, station_key: str, start_date: str, end_date: str) -> Path:
+    def get_output_path(self, station_key: str, start: datetime, end: datetime) -> Path:
         """
         Generate output path for raw JSON file
 
         Args:
             station_key: Station identifier (e.g., "hupsel")
-            start_date: Start date in ISO format
-            end_date: End date in ISO format
+            start: Start of the chunk
+            end: End of the chunk
 
         Returns:
             Path object for output file
         """
-        # Parse dates to get year/month
-        start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-        end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-
-        # Create directory structure: bronze/raw/edr_api/station_id/year/
-        year = start.year
-        station_id = self.station_configs[station_key]["id"]
-        station_dir = station_id.replace('-', '_')
-
-        output_dir = BRONZE_RAW_DIR / "edr_api" / f"station_id={station_dir}" / f"year={year}"
-        output_dir.mkdir(parents=True, exist_ok=True)
+        return build_output_path(
+            self.station_dirs[station_key], start, end, self._ensured_dirs, BRONZE_RAW_DIR
+        )
 
-        # Filename includes date range
-        filename = f"{start.strftime('%Y%m%d')}_to_{end.strftime('%Y%m%d')}.json"
-        return output_dir / filename
+    def has_fresh_output(self, output_path: Path, end: datetime) -> bool:
+        """Check whether an existing output file can be reused for a chunk ending at end"""
+        return not self.force_refresh and is_reusable(output_path, end)
 
-    def query_edr_api_multi_station(
+    def _build_query(
         self,
-        station_ids: List[str],
+        station_ids: Sequence[str],
         start_date: str,
         end_date: str,
         parameters: Optional[List[str]] = None
-    ) -> Dict:
+    ) -> Tuple[str, Dict[str, str]]:
         """
-        Query EDR API for multiple stations in a single request
-
-        Args:
-            station_ids: List of station IDs (e.g., ["0-20000-0-06283", "0-20000-0-06275"])
-            start_date: ISO format datetime string
-            end_date: ISO format datetime string
-            parameters: List of parameter names (None = all parameters)
+        Build the EDR request URL and query parameters, logging the request
 
         Returns:
-            JSON response from API (CoverageCollection format)
+            Tuple of (url, params)
         """
-        # Join station IDs with commas for multi-station query
-        location_param = ",".join(station_ids)
+        # Station IDs joined with commas for multi-station query (prebuilt for our batch)
+        if station_ids is self.station_ids:
+            location_param = self.location_param
+        else:
+            location_param = ",".join(station_ids)
         datetime_range = f"{start_date}/{end_date}"
 
         # Build query parameters
@@ -111,87 +148,166 @@ class BronzeRawIngesterV2:
         # Construct URL
         url = f"{EDR_BASE_URL}/collections/{EDR_COLLECTION}/locations/{location_param}"
 
-        print(f"Querying EDR API (Multi-Station)...")
-        print(f"  Stations: {len(station_ids)} stations")
+        self._log(f"Querying EDR API (Multi-Station)...")
+        self._log(f"  Stations: {len(station_ids)} stations")
         for i, sid in enumerate(station_ids, 1):
-            # Find station name
-            station_name = "Unknown"
-            for key, config in self.station_configs.items():
-                if config["id"] == sid:
-                    station_name = config["name"]
-                    break
-            print(f"    {i}. {station_name} ({sid})")
-        print(f"  Date range: {start_date} to {end_date}")
-        print(f"  Parameters: {'All' if not parameters else ', '.join(parameters)}")
+            station_name = self.id_to_name.get(sid, "Unknown")
+            self._log(f"    {i}. {station_name} ({sid})")
+        self._log(f"  Date range: {start_date} to {end_date}")
+        self._log(f"  Parameters: {'All' if not parameters else ', '.join(parameters)}")
+
+        return url, params
+
+    def query_edr_api_multi_station(
+        self,
+        station_ids: Sequence[str],
+        start_date: str,
+        end_date: str,
+        parameters: Optional[List[str]] = None
+    ) -> Dict:
+        """
+        Query EDR API for multiple stations in a single request
+
+        Args:
+            station_ids: List of station IDs (e.g., ["0-20000-0-06283", "0-20000-0-06275"])
+            start_date: ISO format datetime string
+            end_date: ISO format datetime string
+            parameters: List of parameter names (None = all parameters)
+
+        Returns:
+            JSON response from API (CoverageCollection format)
+        """
+        url, params = self._build_query(station_ids, start_date, end_date, parameters)
 
         # Make API request
         try:
-            response = requests.get(url, params=params, headers=self.headers, timeout=120)
+            self.rate_limiter.wait()
+            response = self.client.get(url, params=params)
             response.raise_for_status()
 
-            data = response.json()
-            response_size = len(json.dumps(data))
-            print(f"  [SUCCESS] Received response ({response_size:,} bytes)")
+            # Size of the body we already hold; no need to re-encode the dict
+            response_size = len(response.content)
+            if not self._encoding_logged:
+                self._log(f"  Protocol: {response.http_version}, Content-Encoding: {response.headers.get('Content-Encoding', 'identity')}")
+                self._encoding_logged = True
+            data = orjson.loads(response.content)
+            self._log(f"  [SUCCESS] Received response ({response_size:,} bytes)")
 
             # Check response type
             if data.get("type") == "CoverageCollection":
                 num_coverages = len(data.get("coverages", []))
-                print(f"  Response type: CoverageCollection ({num_coverages} coverages)")
+                self._log(f"  Response type: CoverageCollection ({num_coverages} coverages)")
             elif data.get("type") == "Coverage":
-                print(f"  Response type: Coverage (single station)")
+                self._log(f"  Response type: Coverage (single station)")
             else:
-                print(f"  Response type: {data.get('type', 'Unknown')}")
+                self._log(f"  Response type: {data.get('type', 'Unknown')}")
 
             return data
 
-        except requests.exceptions.HTTPError as e:
-            print(f"  [ERROR] HTTP {e.response.status_code}: {e}")
+        except httpx.HTTPStatusError as e:
+            self._log(f"  [ERROR] HTTP {e.response.status_code}: {e}")
+            if hasattr(e.response, 'text'):
+                self._log(f"  Response: {e.response.text[:200]}")
+            raise
+        except httpx.RequestError as e:
+            self._log(f"  [ERROR] Request failed: {e}")
+            raise
+
+    def download_bronze_raw(
+        self,
+        station_key: str,
+        start_date: str,
+        end_date: str,
+        output_path: Path,
+        parameters: Optional[List[str]] = None
+    ) -> Path:
+        """
+        Stream a single-station response straight into a Bronze Raw file
+
+        With one station there is nothing to split, so the response is saved
+        as-is (the v1 format) and the body is never parsed and re-serialized:
+        only the _metadata wrapper is written around it. Writes go to a .part
+        file that replaces output_path once complete.
+
+        Args:
+            station_key: Station identifier
+            start_date: ISO format datetime string
+            end_date: ISO format datetime string
+            output_path: Bronze Raw file to write
+            parameters: List of parameter names (None = all parameters)
+
+        Returns:
+            Path to saved file
+        """
+        url, params = self._build_query(self.station_ids, start_date, end_date, parameters)
+
+        tmp_path = output_path.with_name(output_path.name + ".part")
+        try:
+            self.rate_limiter.wait()
+            with self.client.stream("GET", url, params=params) as response:
+                if response.is_error:
+                    response.read()  # Keep the error body for the message below
+                response.raise_for_status()
+                if not self._encoding_logged:
+                    self._log(f"  Protocol: {response.http_version}, Content-Encoding: {response.headers.get('Content-Encoding', 'identity')}")
+                    self._encoding_logged = True
+
+                # iter_bytes undoes the gzip/br transfer encoding while copying
+                with open(tmp_path, 'wb', buffering=WRITE_BUFFER_SIZE) as f:
+                    f.write(b'{"_metadata":' + orjson.dumps(self._build_metadata(station_key)) + b',"data":')
+                    for block in response.iter_bytes(WRITE_BUFFER_SIZE):
+                        f.write(block)
+                    f.write(b'}')
+            os.replace(tmp_path, output_path)
+
+        except httpx.HTTPStatusError as e:
+            self._log(f"  [ERROR] HTTP {e.response.status_code}: {e}")
             if hasattr(e.response, 'text'):
-                print(f"  Response: {e.response.text[:200]}")
+                self._log(f"  Response: {e.response.text[:200]}")
             raise
-        except requests.exceptions.RequestException as e:
-            print(f"  [ERROR] Request failed: {e}")
+        except httpx.RequestError as e:
+            self._log(f"  [ERROR] Request failed: {e}")
             raise
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+        file_size = os.path.getsize(output_path)
+        self._log(f"  [SAVED] {self.station_configs[station_key]['name']}: {output_path.name} ({file_size:,} bytes)")
 
-    def split_coverage_collection(self, data: Dict) -> Dict[str, Dict]:
+        return output_path
+
+    def split_coverage_collection(self, data: Dict) -> Dict[str, Tuple[Dict, Optional[Dict]]]:
         """
         Split CoverageCollection response into individual station coverages
 
+        No per-station collection is built here; save_bronze_raw wraps each
+        coverage when it writes, so only one wrapper exists at a time.
+
         Args:
             data: API response (CoverageCollection or single Coverage)
 
         Returns:
-            Dictionary mapping station_id -> coverage data
+            Dictionary mapping station_id -> (coverage, source collection),
+            where the collection is None for a single Coverage response
         """
         result = {}
 
         # Check if it's a CoverageCollection (multi-station)
         if data.get("type") == "CoverageCollection":
             coverages = data.get("coverages", [])
-            parameters = data.get("parameters", {})
 
-            print(f"  Splitting CoverageCollection into {len(coverages)} station coverages...")
+            self._log(f"  Splitting CoverageCollection into {len(coverages)} station coverages...")
 
             for coverage in coverages:
                 # Extract station ID from coverage
                 station_id = coverage.get("eumetnet:locationId")
 
                 if not station_id:
-                    print(f"    [WARNING] Coverage missing 'eumetnet:locationId', skipping")
+                    self._log(f"    [WARNING] Coverage missing 'eumetnet:locationId', skipping")
                     continue
 
-                # Create single-station CoverageCollection format (same as v1 output)
-                # IMPORTANT: Must wrap in CoverageCollection with array, even for single station
-                station_data = {
-                    "type": "CoverageCollection",
-                    "domainType": data.get("domainType"),
-                    "coverages": [coverage],  # Wrap single coverage in array for compatibility
-                    "parameters": parameters,  # Shared parameters
-                    "referencing": data.get("referencing", [])  # Shared referencing
-                }
-
-                result[station_id] = station_data
-                print(f"    [OK] Extracted coverage for station {station_id}")
+                result[station_id] = (coverage, data)
+                self._log(f"    [OK] Extracted coverage for station {station_id}")
 
         # Single Coverage format (backward compatibility)
         elif data.get("type") == "Coverage":
@@ -201,29 +317,43 @@ class BronzeRawIngesterV2:
             station_id = self.station_ids[0] if len(self.station_ids) == 1 else None
 
             if station_id:
-                result[station_id] = data
-                print(f"  Single Coverage format (station: {station_id})")
+                result[station_id] = (data, None)
+                self._log(f"  Single Coverage format (station: {station_id})")
             else:
-                print(f"  [WARNING] Single Coverage but multiple stations requested")
+                self._log(f"  [WARNING] Single Coverage but multiple stations requested")
 
         else:
-            print(f"  [WARNING] Unexpected response type: {data.get('type')}")
+            self._log(f"  [WARNING] Unexpected response type: {data.get('type')}")
 
         return result
 
+    def _build_metadata(self, station_key: str) -> Dict:
+        """Ingestion metadata stored alongside a station's raw data"""
+        return {
+            "ingestion_timestamp": self.ingestion_timestamp or utc_timestamp(),
+            "station_id": self.station_configs[station_key]["id"],
+            "station_name": self.station_configs[station_key]["name"],
+            "source_api": "KNMI EDR API",
+            "api_collection": EDR_COLLECTION,
+            "ingestion_method": "multi_station_batch" if len(self.station_keys) > 1 else "single_station"
+        }
+
     def save_bronze_raw(
         self,
         station_key: str,
-        data: Dict,
-        start_date: str,
-        end_date: str
+        coverage: Dict,
+        collection: Optional[Dict],
+        start_date: datetime,
+        end_date: datetime
     ) -> Path:
         """
         Save raw JSON response to Bronze Raw layer
 
         Args:
             station_key: Station identifier
-            data: Coverage data for this station
+            coverage: Coverage data for this station
+            collection: CoverageCollection the coverage came from (None if the
+                response was a single Coverage, which is saved as-is)
             start_date: Start date of data
             end_date: End date of data
 
@@ -232,79 +362,136 @@ class BronzeRawIngesterV2:
         """
         output_path = self.get_output_path(station_key, start_date, end_date)
 
-        # Add ingestion metadata
-        metadata = {
-            "ingestion_timestamp": datetime.utcnow().isoformat() + "Z",
-            "station_id": self.station_configs[station_key]["id"],
-            "station_name": self.station_configs[station_key]["name"],
-            "source_api": "KNMI EDR API",
-            "api_collection": EDR_COLLECTION,
-            "ingestion_method": "multi_station_batch" if len(self.station_keys) > 1 else "single_station"
-        }
+        if collection is None:
+            data = coverage
+        else:
+            # Single-station CoverageCollection format (same as v1 output)
+            # IMPORTANT: Must wrap in CoverageCollection with array, even for single station
+            data = {
+                "type": "CoverageCollection",
+                "domainType": collection.get("domainType"),
+                "coverages": [coverage],  # Wrap single coverage in array for compatibility
+                "parameters": collection.get("parameters", {}),  # Shared parameters
+                "referencing": collection.get("referencing", [])  # Shared referencing
+            }
 
         # Combine metadata with raw data (same format as v1)
-        bronze_raw = {
-            "_metadata": metadata,
-            "data": data
-        }
-
-        # Save as formatted JSON
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(bronze_raw, f, indent=2, ensure_ascii=False)
+        write_bronze_json(output_path, self._build_metadata(station_key), data, self.pretty)
 
         file_size = os.path.getsize(output_path)
-        print(f"  [SAVED] {self.station_configs[station_key]['name']}: {output_path.name} ({file_size:,} bytes)")
+        self._log(f"  [SAVED] {self.station_configs[station_key]['name']}: {output_path.name} ({file_size:,} bytes)")
 
         return output_path
 
-    def generate_monthly_chunks(self, start_date_str: str, end_date_str: str) -> List[Dict]:
+    def generate_monthly_chunks(
+        self,
+        start_date: Union[str, datetime],
+        end_date: Union[str, datetime],
+        chunk_months: int = 1
+    ) -> List[Dict]:
+        """Generate monthly date ranges to avoid API limits (see bronze_common)"""
+        return generate_monthly_chunks(start_date, end_date, chunk_months)
+
+    def _process_chunk(
+        self,
+        index: int,
+        total: int,
+        chunk: Dict,
+        parameters: Optional[List[str]]
+    ) -> List[Tuple[str, Path]]:
         """
-        Generate monthly date ranges to avoid API limits
-
-        Args:
-            start_date_str: Start date in ISO format
-            end_date_str: End date in ISO format
+        Query one chunk for all stations and save each station's data
 
         Returns:
-            List of chunk dictionaries with start, end, and month
+            List of (station_key, saved file path)
         """
-        start = datetime.fromisoformat(start_date_str.replace('Z', '+00:00'))
-        end = datetime.fromisoformat(end_date_str.replace('Z', '+00:00'))
-
-        chunks = []
-        current = start
-
-        while current < end:
-            # Calculate chunk end (end of current month)
-            if current.month == 12:
-                chunk_end = current.replace(year=current.year + 1, month=1, day=1) - timedelta(seconds=1)
-            else:
-                chunk_end = current.replace(month=current.month + 1, day=1) - timedelta(seconds=1)
-
-            # Don't exceed overall end date
-            if chunk_end > end:
-                chunk_end = end
+        # Collect the chunk's lines and print them as one block, as chunks
+        # run on several threads
+        self._chunk_output.lines = lines = []
+        try:
+            return self._process_chunk_buffered(index, total, chunk, parameters)
+        finally:
+            self._chunk_output.lines = None
+            # One write per block: print() sends the newline separately
+            print("\n".join(lines) + "\n", end="", flush=True)
 
-            chunks.append({
-                "start": current.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "end": chunk_end.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "month": current.strftime("%Y-%m")
-            })
+    def _process_chunk_buffered(
+        self,
+        index: int,
+        total: int,
+        chunk: Dict,
+        parameters: Optional[List[str]]
+    ) -> List[Tuple[str, Path]]:
+        """Body of _process_chunk; output goes through self._log"""
+        self._log(f"[{index}/{total}] Processing {chunk['month']}...")
+
+        # Bronze Raw files from an earlier run already hold this chunk
+        expected = [
+            (key, self.get_output_path(key, chunk["start_dt"], chunk["end_dt"]))
+            for key in self.station_keys
+        ]
+        if all(self.has_fresh_output(path, chunk["end_dt"]) for _, path in expected):
+            self._log(f"  [SKIP] {chunk['month']} already on disk (use --force-refresh to re-download)")
+            return expected
+
+        # Single API call for all stations in this chunk; a lone station's
+        # compact output is streamed straight to disk
+        try:
+            if len(self.station_keys) == 1 and not self.pretty:
+                station_key, output_path = expected[0]
+                self.download_bronze_raw(
+                    station_key,
+                    chunk["start"],
+                    chunk["end"],
+                    output_path,
+                    parameters
+                )
+                return expected
+            data = self.query_edr_api_multi_station(
+                self.station_ids,
+                chunk["start"],
+                chunk["end"],
+                parameters
+            )
+        except httpx.HTTPStatusError as e:
+            # Window too large for the API: retry it month by month
+            if chunk["months"] > 1 and e.response.status_code in (400, 413):
+                self._log(f"  [RETRY] {chunk['month']} rejected, falling back to monthly chunks")
+                saved = []
+                for sub_chunk in self.generate_monthly_chunks(chunk["start_dt"], chunk["end_dt"]):
+                    saved.extend(self._process_chunk_buffered(index, total, sub_chunk, parameters))
+                return saved
+            raise
 
-            # Move to next month (always use day=1 to avoid "day is out of range" errors)
-            if current.month == 12:
-                current = current.replace(year=current.year + 1, month=1, day=1)
+        # Split response by station
+        station_coverages = self.split_coverage_collection(data)
+
+        # Save each station's data separately
+        saved = []
+        for station_id, (coverage, collection) in station_coverages.items():
+            station_key = self.id_to_key.get(station_id)
+
+            if station_key:
+                output_path = self.save_bronze_raw(
+                    station_key,
+                    coverage,
+                    collection,
+                    chunk["start_dt"],
+                    chunk["end_dt"]
+                )
+                saved.append((station_key, output_path))
             else:
-                current = current.replace(month=current.month + 1, day=1)
+                self._log(f"  [WARNING] Station ID {station_id} not in configured stations")
 
-        return chunks
+        return saved
 
     def ingest(
         self,
         date_range_key: Optional[str] = None,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
-        parameters: Optional[List[str]] = None
+        parameters: Optional[List[str]] = None,
+        chunk_months: int = 1
     ) -> Dict[str, List[Path]]:
         """
         Main ingestion pipeline with multi-station support
@@ -314,6 +501,8 @@ class BronzeRawIngesterV2:
             start_date: Custom start date in ISO format (overrides date_range_key)
             end_date: Custom end date in ISO format (overrides date_range_key)
             parameters: List of parameters to query (None = all)
+            chunk_months: Months per API request (windows the API rejects
+                are retried month by month)
 
         Returns:
             Dictionary mapping station_key -> list of saved file paths
@@ -322,71 +511,53 @@ class BronzeRawIngesterV2:
         print("BRONZE RAW INGESTION: EDR API -> JSON (Multi-Station v2)")
         print("="*80)
 
+        # One timestamp for the whole batch
+        self.ingestion_timestamp = utc_timestamp()
+
         # Determine date range
         if start_date and end_date:
             print(f"Using custom date range")
-        elif date_range_key:
-            date_range = DATE_RANGES[date_range_key]
-            start_date = date_range["start"]
-            end_date = date_range["end"]
+            range_start, range_end = start_date, end_date
         else:
-            print("No date range specified, using default: 'full'")
-            date_range = DATE_RANGES["full"]
+            if not date_range_key:
+                print("No date range specified, using default: 'full'")
+                date_range_key = "full"
+            date_range = DATE_RANGES[date_range_key]
             start_date = date_range["start"]
             end_date = date_range["end"]
+            range_start = DATE_RANGES_PARSED[date_range_key]["start"]
+            range_end = DATE_RANGES_PARSED[date_range_key]["end"]
 
-        # Generate monthly chunks
-        chunks = self.generate_monthly_chunks(start_date, end_date)
+        # Generate request windows (monthly by default)
+        chunks = self.generate_monthly_chunks(range_start, range_end, chunk_months)
         print(f"\nDate range: {start_date} to {end_date}")
-        print(f"Split into {len(chunks)} monthly chunks")
+        print(f"Split into {len(chunks)} chunks of up to {chunk_months} month(s)")
         print(f"Stations per batch: {len(self.station_keys)}")
         print(f"Total API calls: {len(chunks)} (vs {len(chunks) * len(self.station_keys)} single-station)\n")
 
         saved_files = {key: [] for key in self.station_keys}
 
-        # Process each chunk (one API call per chunk, covers all stations)
-        for i, chunk in enumerate(chunks, 1):
-            print(f"[{i}/{len(chunks)}] Processing {chunk['month']}...")
-
-            try:
-                # Single API call for all stations in this chunk
-                data = self.query_edr_api_multi_station(
-                    self.station_ids,
-                    chunk["start"],
-                    chunk["end"],
-                    parameters
-                )
-
-                # Split response by station
-                station_coverages = self.split_coverage_collection(data)
-
-                # Save each station's data separately
-                for station_id, coverage_data in station_coverages.items():
-                    # Find station key for this ID
-                    station_key = None
-                    for key, config in self.station_configs.items():
-                        if config["id"] == station_id:
-                            station_key = key
-                            break
-
-                    if station_key:
-                        output_path = self.save_bronze_raw(
-                            station_key,
-                            coverage_data,
-                            chunk["start"],
-                            chunk["end"]
-                        )
+        # Chunks are independent (one API call each, covering all stations)
+        # and write to distinct files, so they run concurrently
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            futures = {
+                executor.submit(self._process_chunk, i, len(chunks), chunk, parameters): chunk
+                for i, chunk in enumerate(chunks, 1)
+            }
+
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    for station_key, output_path in future.result():
                         saved_files[station_key].append(output_path)
-                    else:
-                        print(f"  [WARNING] Station ID {station_id} not in configured stations")
+                except Exception as e:
+                    print(f"  [ERROR] Failed to process {chunk['month']}: {e}")
+                    import traceback
+                    traceback.print_exc()
 
-                # No delay needed - API supports 200 req/sec, we're well below that
-
-            except Exception as e:
-                print(f"  [ERROR] Failed to process {chunk['month']}: {e}")
-                import traceback
-                traceback.print_exc()
-                continue
+        # Completion order is arbitrary; keep the file lists chronological
+        for files in saved_files.values():
+            files.sort()
 
         print("\n" + "="*80)
         print(f"[COMPLETE] Bronze Raw ingestion finished")
@@ -439,6 +610,28 @@ def main():
         help="Specific parameters to query (default: all)"
     )
 
+    # Request window
+    parser.add_argument(
+        "--chunk-months",
+        type=int,
+        default=1,
+        help="Months per API request (default: 1; windows stop at year ends)"
+    )
+
+    # Re-download chunks that already exist on disk
+    parser.add_argument(
+        "--force-refresh",
+        action="store_true",
+        help="Query the API even for chunks already saved to Bronze Raw"
+    )
+
+    # Output format
+    parser.add_argument(
+        "--pretty",
+        action="store_true",
+        help="Write indented JSON (default: compact)"
+    )
+
     args = parser.parse_args()
 
     # Determine station list
@@ -455,13 +648,16 @@ def main():
         return
 
     # Run ingestion
-    ingester = BronzeRawIngesterV2(station_keys)
-    ingester.ingest(
-        date_range_key=args.date_range,
-        start_date=args.start_date,
-        end_date=args.end_date,
-        parameters=args.parameters
-    )
+    with BronzeRawIngesterV2(
+        station_keys, pretty=args.pretty, force_refresh=args.force_refresh
+    ) as ingester:
+        ingester.ingest(
+            date_range_key=args.date_range,
+            start_date=args.start_date,
+            end_date=args.end_date,
+            parameters=args.parameters,
+            chunk_months=args.chunk_months
+        )
 
 
 if __name__ == "__main__":
@@ -4,7 +4,7 @@ Script to explore KNMI EDR API capabilities
 import os
 import requests
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 
 # Load environment variables (in parent directory)
@@ -112,9 +112,9 @@ except requests.exceptions.RequestException as e:
 print("\n4. TEST QUERY: Deelen Station (Last 48 Hours)")
 print("-"*80)
 deelen_id = "0-20000-0-06275"
-end_time = datetime.utcnow()
+end_time = datetime.now(timezone.utc)
 start_time = end_time - timedelta(hours=48)
-datetime_range = f"{start_time.isoformat()}Z/{end_time.isoformat()}Z"
+datetime_range = f"{start_time:%Y-%m-%dT%H:%M:%SZ}/{end_time:%Y-%m-%dT%H:%M:%SZ}"
 
 params = {
     "datetime": datetime_range,
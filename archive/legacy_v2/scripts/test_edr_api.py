@@ -3,10 +3,13 @@ Test script for KNMI EDR API using environment variables
 Run this after setting up your .env file
 """
 import os
+import atexit
+import hashlib
+from pathlib import Path
 from dotenv import load_dotenv
 import requests
 import json
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 
 # Load environment variables from .env file (in parent directory)
 load_dotenv("../.env")
@@ -24,7 +27,42 @@ if not EDR_API_KEY:
 
 # EDR API Configuration
 EDR_BASE_URL = "https://api.dataplatform.knmi.nl/edr/v1"
-headers = {"Authorization": EDR_API_KEY}
+
+# One keep-alive session for all test requests: a single TLS handshake per run
+session = requests.Session()
+session.headers["Authorization"] = EDR_API_KEY
+atexit.register(session.close)  # Also covers the exit(1) paths below
+
+# Collection metadata barely changes, so it is fetched conditionally:
+# URL -> {"etag": ..., "body_path": ...}, bodies stored next to the index
+ETAG_CACHE_FILE = Path(__file__).parent.parent / "logs" / ".edr_etag_cache.json"
+ETAG_BODY_DIR = ETAG_CACHE_FILE.parent / ".edr_etag_bodies"
+
+
+def get_metadata(url):
+    """GET a metadata endpoint with If-None-Match; a 304 is served from disk"""
+    etag_cache = json.loads(ETAG_CACHE_FILE.read_text()) if ETAG_CACHE_FILE.exists() else {}
+    cached = etag_cache.get(url)
+
+    headers = {}
+    if cached and Path(cached["body_path"]).exists():
+        headers["If-None-Match"] = cached["etag"]
+
+    response = session.get(url, headers=headers)
+    if response.status_code == 304:
+        print("  (not modified, using cached response)")
+        return json.loads(Path(cached["body_path"]).read_bytes())
+
+    response.raise_for_status()
+    etag = response.headers.get("ETag")
+    if etag:
+        ETAG_BODY_DIR.mkdir(parents=True, exist_ok=True)
+        body_path = ETAG_BODY_DIR / f"{hashlib.sha256(url.encode()).hexdigest()}.json"
+        body_path.write_bytes(response.content)
+        etag_cache[url] = {"etag": etag, "body_path": str(body_path)}
+        ETAG_CACHE_FILE.write_text(json.dumps(etag_cache, indent=2))
+    return response.json()
+
 
 print("="*80)
 print("KNMI EDR API TEST (Using .env)")
@@ -36,9 +74,7 @@ print()
 print("1. LISTING AVAILABLE EDR COLLECTIONS")
 print("-"*80)
 try:
-    response = requests.get(f"{EDR_BASE_URL}/collections", headers=headers)
-    response.raise_for_status()
-    collections_data = response.json()
+    collections_data = get_metadata(f"{EDR_BASE_URL}/collections")
 
     if "collections" in collections_data:
         print(f"[OK] Success! Found {len(collections_data['collections'])} collections:\n")
@@ -66,9 +102,7 @@ print("\n2. HOURLY OBSERVATIONS COLLECTION DETAILS")
 print("-"*80)
 collection_id = "hourly-in-situ-meteorological-observations-validated"
 try:
-    response = requests.get(f"{EDR_BASE_URL}/collections/{collection_id}", headers=headers)
-    response.raise_for_status()
-    collection_info = response.json()
+    collection_info = get_metadata(f"{EDR_BASE_URL}/collections/{collection_id}")
 
     print(f"[OK] Collection: {collection_info.get('title', 'N/A')}")
 
@@ -92,9 +126,7 @@ except requests.exceptions.RequestException as e:
 print("\n3. AVAILABLE WEATHER STATIONS")
 print("-"*80)
 try:
-    response = requests.get(f"{EDR_BASE_URL}/collections/{collection_id}/locations", headers=headers)
-    response.raise_for_status()
-    locations_data = response.json()
+    locations_data = get_metadata(f"{EDR_BASE_URL}/collections/{collection_id}/locations")
 
     if 'features' in locations_data:
         print(f"[OK] Found {len(locations_data['features'])} weather stations:\n")
@@ -113,9 +145,9 @@ except requests.exceptions.RequestException as e:
 print("\n4. TEST QUERY: Deelen Station (Last 24 Hours)")
 print("-"*80)
 deelen_id = "0-20000-0-06275"
-end_time = datetime.utcnow()
+end_time = datetime.now(timezone.utc)
 start_time = end_time - timedelta(hours=24)
-datetime_range = f"{start_time.isoformat()}Z/{end_time.isoformat()}Z"
+datetime_range = f"{start_time:%Y-%m-%dT%H:%M:%SZ}/{end_time:%Y-%m-%dT%H:%M:%SZ}"
 
 params = {
     "datetime": datetime_range,
@@ -128,7 +160,7 @@ try:
     print(f"Date range: {start_time.strftime('%Y-%m-%d %H:%M')} to {end_time.strftime('%Y-%m-%d %H:%M')}")
     print(f"Parameters: {params['parameter-name']}")
 
-    response = requests.get(url, params=params, headers=headers)
+    response = session.get(url, params=params)
     response.raise_for_status()
     data = response.json()
 
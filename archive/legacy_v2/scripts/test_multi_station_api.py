@@ -8,16 +8,23 @@ Usage:
     python scripts/test_multi_station_api.py
 """
 
+import os
 import sys
 from pathlib import Path
 import json
 import requests
 from datetime import datetime
 
+# orjson parses the multi-MB coverage much faster; stdlib json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from config import EDR_API_KEY, EDR_BASE_URL, EDR_COLLECTION, STATIONS
+from config import EDR_BASE_URL, EDR_COLLECTION, STATIONS, require_edr_key
 
 def test_multi_station_query():
     """Test querying multiple stations in a single API call"""
@@ -54,26 +61,37 @@ def test_multi_station_query():
     print(f"  URL: {url}")
     print(f"  Params: {params}")
 
-    headers = {"Authorization": EDR_API_KEY}
+    session = requests.Session()
+    session.headers["Authorization"] = require_edr_key()
 
     # Make request
     print(f"\nSending request...")
     try:
-        response = requests.get(url, params=params, headers=headers, timeout=60)
+        response = session.get(url, params=params, timeout=60)
         response.raise_for_status()
 
+        # The body is needed in full for the structure dump below, so read it
+        # once; Content-Length is the (possibly compressed) transfer size
+        body = response.content
+        response_size = len(body)
+        wire_size = int(response.headers.get('Content-Length') or 0) or response_size
+
         print(f"  [OK] Response received!")
         print(f"  Status: {response.status_code}")
-        print(f"  Size: {len(response.content):,} bytes")
+        print(f"  Size: {response_size:,} bytes (wire: {wire_size:,} bytes, {response.headers.get('Content-Encoding', 'identity')})")
         print(f"  Content-Type: {response.headers.get('Content-Type')}")
 
         # Parse JSON
-        data = response.json()
+        data = orjson.loads(body) if orjson is not None else json.loads(body)
 
         # Save response for analysis
         output_file = Path("scripts/test_multi_station_response.json")
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            with open(output_file, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
 
         print(f"\n  [OK] Saved response to: {output_file}")
 
@@ -170,7 +188,7 @@ def test_multi_station_query():
         print("TEST SUMMARY")
         print("="*80)
         print(f"[SUCCESS] Multi-station query successful!")
-        print(f"[SUCCESS] Response size: {len(response.content):,} bytes")
+        print(f"[SUCCESS] Response size: {response_size:,} bytes (wire: {wire_size:,} bytes)")
         print(f"[SUCCESS] Response saved for detailed analysis")
         print(f"\nNext steps:")
         print(f"  1. Examine test_multi_station_response.json")
@@ -181,13 +199,16 @@ def test_multi_station_query():
 
     except requests.exceptions.HTTPError as e:
         print(f"\n[ERROR] HTTP Error: {e.response.status_code}")
-        print(f"  Response: {e.response.text[:500]}")
+        print(f"  Response: {e.response.content[:500].decode('utf-8', errors='replace')}")
         return None
     except Exception as e:
         print(f"\n[ERROR] Error: {e}")
-        import traceback
-        traceback.print_exc()
+        if os.environ.get('DEBUG'):
+            import traceback
+            traceback.print_exc()
         return None
+    finally:
+        session.close()
 
 
 if __name__ == "__main__":
@@ -17,8 +17,9 @@ from pathlib import Path
 import requests
 import time
 from config import (
-    EDR_API_KEY, EDR_BASE_URL, EDR_COLLECTION,
-    BRONZE_RAW_DIR, STATIONS, DATE_RANGES, EDR_PARAMETERS
+    EDR_BASE_URL, EDR_COLLECTION,
+    BRONZE_RAW_DIR, STATIONS, DATE_RANGES, EDR_PARAMETERS,
+    require_edr_key
 )
 
 class BronzeRawIngester:
@@ -28,7 +29,7 @@ class BronzeRawIngester:
         self.station_key = station_key
         self.station_config = STATIONS[station_key]
         self.station_id = self.station_config["id"]
-        self.headers = {"Authorization": EDR_API_KEY}
+        self.headers = {"Authorization": require_edr_key()}
 
     def get_output_path(self, start_date, end_date):
         """Generate output path for raw JSON file"""
@@ -7,6 +7,7 @@ Reuses existing project configuration where possible.
 import os
 import json
 from pathlib import Path
+from types import MappingProxyType
 from dotenv import load_dotenv
 
 # Get project root (3 levels up: bronze_raw -> data_orchestration -> project_root)
@@ -63,14 +64,14 @@ def load_stations():
 
     return config['stations']
 
-# Station registry
-STATIONS = load_stations()
+# Station registry (read-only)
+STATIONS = MappingProxyType(load_stations())
 
-# Get list of station keys for core 10
-CORE_10_STATIONS = [
+# Station keys for core 10
+CORE_10_STATIONS = (
     'hupsel', 'deelen', 'de_bilt', 'schiphol', 'rotterdam',
     'vlissingen', 'maastricht', 'eelde', 'den_helder', 'twenthe'
-]
+)
 
 def get_station_id(station_key: str) -> str:
     """Get EDR API ID for a station key"""
@@ -6,7 +6,7 @@ One JSON file per station for easy visibility and debugging.
 """
 import json
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 
 from .config import get_station_id, get_station_name, PROJECT_ROOT
@@ -72,7 +72,7 @@ class StationMetadata:
             "station_id": self.station_id,
             "station_name": self.station_name,
             "years_loaded": self.years_loaded,
-            "last_updated": datetime.utcnow().isoformat() + "Z",
+            "last_updated": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
             "summary": {
                 "total_years": len(self.years_loaded),
                 "total_size_mb": round(total_size_mb, 2),
@@ -121,7 +121,7 @@ class StationMetadata:
         # Create metadata entry
         entry = {
             "year": year,
-            "loaded_at": datetime.utcnow().isoformat() + "Z"
+            "loaded_at": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
         }
 
         if file_path:
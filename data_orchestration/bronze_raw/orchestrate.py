@@ -12,6 +12,7 @@ from concurrent.futures import ThreadPoolExecutor, as_completed
 from typing import List, Dict, Any
 
 from .config import (
+    STATIONS,
     CORE_10_STATIONS,
     MAX_CONCURRENT_STATIONS,
     LOGS_DIR,
@@ -300,10 +301,17 @@ Examples:
     if args.station:
         stations = [args.station]
     elif args.stations == 'core_10':
-        stations = CORE_10_STATIONS
+        stations = list(CORE_10_STATIONS)
     else:
         stations = [s.strip() for s in args.stations.split(',')]
 
+    # Validate stations before any worker threads start
+    invalid_stations = [s for s in stations if s not in STATIONS]
+    if invalid_stations:
+        print(f"Error: Unknown stations: {', '.join(invalid_stations)}")
+        print(f"Available stations: {', '.join(STATIONS.keys())}")
+        sys.exit(1)
+
     # Validate years
     if args.start_year > args.end_year:
         print(f"Error: start-year ({args.start_year}) cannot be after end-year ({args.end_year})")
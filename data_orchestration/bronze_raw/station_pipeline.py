@@ -149,12 +149,12 @@ class StationPipeline:
         """
         # Check metadata if already loaded
         if self.skip_existing and self.metadata.is_year_loaded(year):
-            logger.debug(f"  Skipping {self.station_name} {year} (already in metadata)")
+            logger.debug("  Skipping %s %d (already in metadata)", self.station_name, year)
             self.skipped_years += 1
             return
 
         # Fetch from API
-        logger.info(f"  Fetching {self.station_name} {year}...")
+        logger.info("  Fetching %s %d...", self.station_name, year)
         year_start_time = time.time()
 
         data = fetch_station_year(self.station_id, year)
@@ -174,7 +174,8 @@ class StationPipeline:
         self.metadata.mark_year_loaded(year, file_path=str(output_path), size_mb=file_size_mb)
 
         # Log with structured data
-        logger.info(f"  [OK] {self.station_name} {year} -> {output_path} ({file_size_mb:.2f} MB, {year_duration:.1f}s)")
+        logger.info("  [OK] %s %d -> %s (%.2f MB, %.1fs)",
+                    self.station_name, year, output_path, file_size_mb, year_duration)
 
         structured_logger.log_year_loaded(
             station_key=self.station_key,
@@ -3,12 +3,19 @@ Structured JSON Logging for Bronze Raw Ingestion
 
 Provides both human-readable console logs and structured JSON logs for analysis.
 """
+import os
 import json
 import logging
+import threading
 from pathlib import Path
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Dict, Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from .config import LOGS_DIR
 
 
@@ -17,10 +24,10 @@ class JSONFormatter(logging.Formatter):
     Custom formatter that outputs structured JSON logs.
     """
 
-    def format(self, record: logging.LogRecord) -> str:
-        """Format log record as JSON"""
+    def build_record(self, record: logging.LogRecord) -> Dict[str, Any]:
+        """Build the JSON-serializable dict for a log record"""
         log_data = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -34,7 +41,99 @@ class JSONFormatter(logging.Formatter):
         if record.exc_info:
             log_data["exception"] = self.formatException(record.exc_info)
 
-        return json.dumps(log_data)
+        return log_data
+
+    def format(self, record: logging.LogRecord) -> str:
+        """Format log record as JSON"""
+        return json.dumps(self.build_record(record), default=str)
+
+
+class BufferedNDJSONHandler(logging.Handler):
+    """
+    Handler that appends NDJSON lines to a reusable in-memory buffer.
+
+    Records are serialized straight to bytes (orjson when available) and
+    written with a single write() once the buffer reaches FLUSH_THRESHOLD
+    bytes. ERROR and above are written immediately, and a daemon thread
+    writes whatever is buffered every FLUSH_INTERVAL seconds, so a quiet
+    run still reaches the file. Remaining records are written on
+    flush()/close(), which logging calls at interpreter shutdown.
+    """
+
+    FLUSH_THRESHOLD = 128 * 1024  # bytes
+    FLUSH_INTERVAL = 5.0  # seconds
+
+    def __init__(self, log_file: Path):
+        """
+        Open the log file for appending.
+
+        Args:
+            log_file: Path to NDJSON log file
+        """
+        super().__init__()
+        self.fd = os.open(log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self.buffer = bytearray()
+        self.setFormatter(JSONFormatter())
+
+        self._closing = threading.Event()
+        self._flusher = threading.Thread(
+            target=self._flush_periodically, name="ndjson-log-flusher", daemon=True
+        )
+        self._flusher.start()
+
+    def _flush_periodically(self):
+        """Flush every FLUSH_INTERVAL seconds until the handler is closed"""
+        while not self._closing.wait(self.FLUSH_INTERVAL):
+            self.flush()
+
+    def emit(self, record: logging.LogRecord):
+        """Serialize record into the buffer, writing it out on threshold or error"""
+        try:
+            log_data = self.formatter.build_record(record)
+            if orjson is not None:
+                self.buffer += orjson.dumps(log_data, default=str)
+            else:
+                self.buffer += json.dumps(log_data, default=str).encode('utf-8')
+            self.buffer += b"\n"
+
+            if len(self.buffer) >= self.FLUSH_THRESHOLD or record.levelno >= logging.ERROR:
+                self._write_buffer()
+        except Exception:
+            self.handleError(record)
+
+    def _write_buffer(self):
+        """Write the whole buffer to the file and reset it"""
+        view = memoryview(self.buffer)
+        while view:
+            written = os.write(self.fd, view)
+            view = view[written:]
+        view.release()
+        del self.buffer[:]
+
+    def flush(self):
+        """Write any buffered records to the file"""
+        self.acquire()
+        try:
+            if self.buffer and self.fd is not None:
+                self._write_buffer()
+        finally:
+            self.release()
+
+    def close(self):
+        """Flush remaining records and close the file"""
+        # Stop the flusher first; it takes the handler lock in flush()
+        self._closing.set()
+        self._flusher.join()
+
+        self.acquire()
+        try:
+            self.flush()
+            if self.fd is not None:
+                os.close(self.fd)
+                self.fd = None
+        finally:
+            self.release()
+        super().close()
 
 
 class StructuredLogger:
@@ -61,29 +160,33 @@ class StructuredLogger:
         """
         self.json_log_file = log_file
 
-        # Create JSON file handler
-        json_handler = logging.FileHandler(log_file)
+        # Create buffered NDJSON file handler
+        json_handler = BufferedNDJSONHandler(log_file)
         json_handler.setLevel(logging.DEBUG)
-        json_handler.setFormatter(JSONFormatter())
 
         self.logger.addHandler(json_handler)
 
-    def log_event(self, level: str, message: str, **extra_data):
+    def log_event(self, level: str, message: str, *args, **extra_data):
         """
         Log an event with structured data.
 
+        The message is %-formatted with args only if a handler consumes
+        the record, so disabled levels cost no string formatting.
+
         Args:
             level: Log level (INFO, WARNING, ERROR, etc.)
-            message: Human-readable message
+            message: Human-readable message (%-style format string)
+            *args: Arguments for the message format string
             **extra_data: Additional structured data to log
         """
-        # Create log record with extra data
-        log_method = getattr(self.logger, level.lower())
+        level_no = logging.getLevelName(level.upper())
+        if not self.logger.isEnabledFor(level_no):
+            return
 
         # Attach extra data to the record
         extra = {'extra_data': extra_data} if extra_data else {}
 
-        log_method(message, extra=extra)
+        self.logger.log(level_no, message, *args, extra=extra)
 
     def log_year_loaded(self, station_key: str, station_name: str, year: int,
                        file_path: str, size_mb: float, duration_sec: float):
@@ -100,7 +203,7 @@ class StructuredLogger:
         """
         self.log_event(
             'INFO',
-            f"{station_name} {year} loaded successfully",
+            "%s %d loaded successfully", station_name, year,
             event_type="year_loaded",
             station_key=station_key,
             station_name=station_name,
@@ -128,7 +231,7 @@ class StructuredLogger:
         """
         self.log_event(
             'INFO',
-            f"{station_name} complete: {completed_years} loaded, {skipped_years} skipped",
+            "%s complete: %d loaded, %d skipped", station_name, completed_years, skipped_years,
             event_type="station_complete",
             station_key=station_key,
             station_name=station_name,
@@ -156,7 +259,7 @@ class StructuredLogger:
         """
         self.log_event(
             'INFO',
-            f"Pipeline complete: {successful_stations}/{total_stations} stations succeeded",
+            "Pipeline complete: %d/%d stations succeeded", successful_stations, total_stations,
             event_type="pipeline_complete",
             total_stations=total_stations,
             successful_stations=successful_stations,
@@ -2,21 +2,38 @@
 Configuration for the weather data pipeline
 """
 import os
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from dotenv import load_dotenv
 
 # Get project root directory (parent of src/)
 PROJECT_ROOT = Path(__file__).parent.parent.absolute()
 
-# Load environment variables from parent of project root
-load_dotenv(PROJECT_ROOT.parent / ".env")
 
 # API Configuration
-EDR_API_KEY = os.getenv("KNMI_EDR_API_KEY")
-OPEN_DATA_API_KEY = os.getenv("KNMI_OPEN_DATA_API_KEY")
+# Keys are loaded on first use, so importing config (e.g. for --help or the
+# transform scripts) needs neither a .env file nor an API key
+@lru_cache(maxsize=None)
+def _load_env():
+    """Load environment variables from parent of project root (once)"""
+    from dotenv import load_dotenv
+    load_dotenv(PROJECT_ROOT.parent / ".env")
+
+
+def require_edr_key():
+    """Return the EDR API key, raising ValueError if it is not configured"""
+    _load_env()
+    key = os.getenv("KNMI_EDR_API_KEY")
+    if not key:
+        raise ValueError("KNMI_EDR_API_KEY not found in .env file")
+    return key
+
+
+def get_open_data_key():
+    """Return the Open Data API key (None if not configured)"""
+    _load_env()
+    return os.getenv("KNMI_OPEN_DATA_API_KEY")
 
-if not EDR_API_KEY:
-    raise ValueError("KNMI_EDR_API_KEY not found in .env file")
 
 # API Endpoints
 EDR_BASE_URL = "https://api.dataplatform.knmi.nl/edr/v1"
@@ -100,6 +117,15 @@ DATE_RANGES = {
     }
 }
 
+# Same ranges as timezone-aware datetimes, parsed once at import
+DATE_RANGES_PARSED = {
+    key: {
+        "start": datetime.fromisoformat(value["start"].replace('Z', '+00:00')),
+        "end": datetime.fromisoformat(value["end"].replace('Z', '+00:00'))
+    }
+    for key, value in DATE_RANGES.items()
+}
+
 # All available parameters from EDR API
 # Leave empty to get all parameters, or specify subset
 EDR_PARAMETERS = []  # Empty = get all available parameters
@@ -8,13 +8,42 @@ Usage:
     python src/query_demo.py
 """
 
+import os
 import duckdb
+import numpy as np
 import pandas as pd
 import polars as pl
+import pyarrow as pa
+import pyarrow.dataset as ds
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from config import SILVER_DIR
 import time
 
+# Parquet footers are read concurrently; the reads are I/O-bound and
+# Polars releases the GIL while parsing them
+FOOTER_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# DuckDB settings for the demo: the Silver layer is small (tens of thousands
+# of rows per station-year), so a few threads beat fanning out to every core.
+# Every demo query has an ORDER BY, so insertion order need not be preserved
+DUCKDB_CONFIG = {
+    "threads": min(4, os.cpu_count() or 1),
+    "memory_limit": "2GB",
+    "preserve_insertion_order": False
+}
+
+
+def print_query(con, query):
+    """Run a DuckDB query and print its result table"""
+    # Fetched as Arrow; only the (small) printed result is converted to
+    # pandas, for its table formatting. DuckDB >= 1.4 returns a
+    # RecordBatchReader from .arrow(), older versions a Table
+    result = con.execute(query).arrow()
+    if isinstance(result, pa.RecordBatchReader):
+        result = result.read_all()
+    print(result.to_pandas().to_string(index=False))
+
 
 def demo_duckdb_queries():
     """Demonstrate DuckDB queries on Silver Parquet files (all stations)"""
@@ -25,61 +54,121 @@ def demo_duckdb_queries():
     print()
 
     # Connect to DuckDB (in-memory)
-    con = duckdb.connect()
+    con = duckdb.connect(config=DUCKDB_CONFIG)
 
     # Path to ALL Silver data (all stations)
     silver_path = str(SILVER_DIR / "weather_observations" / "**" / "*.parquet")
 
     print(f"Querying all stations: {silver_path}\n")
 
+    # Register the dataset once: all queries share one view, and the object
+    # cache keeps Parquet footers/statistics between queries instead of
+    # re-reading them for every query
+    con.execute("SET enable_object_cache = true")
+    con.execute(f"""
+    CREATE VIEW observations AS
+    SELECT * FROM read_parquet(
+        '{silver_path}',
+        hive_partitioning = true,
+        hive_types = {{'year': SMALLINT, 'month': TINYINT}}
+    )
+    """)
+
+    # Scan the observations once into per station-month partial aggregates;
+    # the queries below roll these up instead of re-reading the Parquet
+    # files. Averages are kept as sum and count so they combine exactly.
+    # year and month are the hive partition keys (Silver is partitioned by
+    # the UTC month), so they come from the file paths, not from the rows
+    con.execute("""
+    CREATE TEMP TABLE monthly AS
+    SELECT
+        station_id,
+        year,
+        month,
+        COUNT(*) as hours,
+        SUM(temperature_celsius) as temp_sum,
+        COUNT(temperature_celsius) as temp_count,
+        MIN(temperature_celsius) as temp_min,
+        MAX(temperature_celsius) as temp_max,
+        ARG_MIN(timestamp, temperature_celsius) as coldest_at,
+        ARG_MAX(timestamp, temperature_celsius) as hottest_at,
+        SUM(humidity_percent) as humidity_sum,
+        COUNT(humidity_percent) as humidity_count,
+        SUM(rainfall_mm) as rain_sum,
+        COUNT(rainfall_mm) as rain_count,
+        MAX(rainfall_mm) as rain_max,
+        COUNT(*) FILTER (WHERE rainfall_mm > 0) as rain_hours,
+        SUM(quality_score) as quality_sum,
+        COUNT(quality_score) as quality_count,
+        COUNT(*) FILTER (WHERE has_outliers) as outlier_count,
+        SUM(wind_speed_ms) as wind_sum,
+        COUNT(wind_speed_ms) as wind_count,
+        MAX(wind_speed_ms) as wind_max,
+        MAX(wind_gust_ms) FILTER (WHERE wind_speed_ms IS NOT NULL) as gust_max,
+        COUNT(*) FILTER (WHERE wind_speed_ms > 10) as strong_wind_hours
+    FROM observations
+    GROUP BY station_id, year, month
+    """)
+
     # Query 1: Station comparison
     print("1. MULTI-STATION COMPARISON (2024-2025)")
     print("-"*80)
 
+    # Row counts and the timestamp range come from the Parquet footers
+    # (row group sizes and column statistics)
     query = f"""
-    SELECT
-        station_id,
-        COUNT(*) as total_hours,
-        MIN(timestamp) as start_date,
-        MAX(timestamp) as end_date,
-        ROUND(AVG(temperature_celsius), 2) as avg_temp,
-        ROUND(MIN(temperature_celsius), 2) as min_temp,
-        ROUND(MAX(temperature_celsius), 2) as max_temp,
-        ROUND(AVG(humidity_percent), 1) as avg_humidity,
-        ROUND(SUM(rainfall_mm), 1) as total_rainfall_mm
-    FROM '{silver_path}'
-    GROUP BY station_id
+    WITH footer_stats AS (
+        SELECT
+            regexp_extract(file_name, 'station_id=([^/\\\\]+)', 1) as station_id,
+            CAST(SUM(row_group_num_rows) AS BIGINT) as total_hours,
+            MIN(CAST(stats_min_value AS TIMESTAMPTZ)) as start_date,
+            MAX(CAST(stats_max_value AS TIMESTAMPTZ)) as end_date
+        FROM parquet_metadata('{silver_path}')
+        WHERE path_in_schema = 'timestamp'
+        GROUP BY 1
+    ),
+    measurements AS (
+        SELECT
+            station_id,
+            ROUND(SUM(temp_sum) / SUM(temp_count), 2) as avg_temp,
+            ROUND(MIN(temp_min), 2) as min_temp,
+            ROUND(MAX(temp_max), 2) as max_temp,
+            ROUND(SUM(humidity_sum) / SUM(humidity_count), 1) as avg_humidity,
+            ROUND(SUM(rain_sum), 1) as total_rainfall_mm
+        FROM monthly
+        GROUP BY station_id
+    )
+    SELECT *
+    FROM footer_stats
+    JOIN measurements USING (station_id)
     ORDER BY station_id
     """
 
-    result = con.execute(query).df()
-    print(result.to_string(index=False))
+    print_query(con, query)
     print()
 
     # Query 2: Monthly averages across all stations
     print("\n2. MONTHLY AVERAGES - ALL STATIONS (2024-2025)")
     print("-"*80)
 
-    query = f"""
+    query = """
     SELECT
         station_id,
-        YEAR(timestamp) as year,
-        MONTH(timestamp) as month,
-        COUNT(*) as hours,
-        ROUND(AVG(temperature_celsius), 2) as avg_temp,
-        ROUND(AVG(humidity_percent), 1) as avg_humidity,
-        ROUND(SUM(rainfall_mm), 1) as rainfall_mm
-    FROM '{silver_path}'
-    GROUP BY station_id, YEAR(timestamp), MONTH(timestamp)
+        year,
+        month,
+        hours,
+        ROUND(temp_sum / temp_count, 2) as avg_temp,
+        ROUND(humidity_sum / humidity_count, 1) as avg_humidity,
+        ROUND(rain_sum, 1) as rainfall_mm
+    FROM monthly
     ORDER BY station_id, year, month
     LIMIT 12
     """
 
-    result = con.execute(query).df()
-    print(result.to_string(index=False))
+    print_query(con, query)
 
     # Get total count for display
-    count_query = f"SELECT COUNT(DISTINCT YEAR(timestamp)*100+MONTH(timestamp)) * COUNT(DISTINCT station_id) FROM '{silver_path}'"
+    count_query = "SELECT COUNT(*) FROM monthly"
     total_count = con.execute(count_query).fetchone()[0]
     print(f"\n... showing first 12 of {total_count} total month-station combinations\n")
 
@@ -87,120 +176,126 @@ def demo_duckdb_queries():
     print("\n3. TEMPERATURE COMPARISON - HOTTEST vs COLDEST")
     print("-"*80)
 
-    query = f"""
-    WITH station_extremes AS (
+    # Both extremes per station come from the monthly extremes (no window
+    # sorts); the materialized CTE holds one row per station
+    query = """
+    WITH station_extremes AS MATERIALIZED (
         SELECT
             station_id,
-            timestamp,
-            temperature_celsius,
-            ROW_NUMBER() OVER (PARTITION BY station_id ORDER BY temperature_celsius DESC) as hot_rank,
-            ROW_NUMBER() OVER (PARTITION BY station_id ORDER BY temperature_celsius ASC) as cold_rank
-        FROM '{silver_path}'
+            ARG_MAX(hottest_at, temp_max) as hot_timestamp,
+            MAX(temp_max) as hot_temp,
+            ARG_MIN(coldest_at, temp_min) as cold_timestamp,
+            MIN(temp_min) as cold_temp
+        FROM monthly
+        GROUP BY station_id
     )
     SELECT
         station_id,
         'HOTTEST' as extreme_type,
-        timestamp,
-        ROUND(temperature_celsius, 1) as temp_celsius
+        hot_timestamp as timestamp,
+        ROUND(hot_temp, 1) as temp_celsius
     FROM station_extremes
-    WHERE hot_rank = 1
     UNION ALL
     SELECT
         station_id,
         'COLDEST' as extreme_type,
-        timestamp,
-        ROUND(temperature_celsius, 1) as temp_celsius
+        cold_timestamp as timestamp,
+        ROUND(cold_temp, 1) as temp_celsius
     FROM station_extremes
-    WHERE cold_rank = 1
     ORDER BY station_id, extreme_type DESC
     """
 
-    result = con.execute(query).df()
-    print(result.to_string(index=False))
+    print_query(con, query)
     print()
 
     # Query 4: Rainfall comparison
     print("\n4. RAINFALL COMPARISON - TOTAL BY STATION")
     print("-"*80)
 
-    query = f"""
+    # Counts are rolled up once in the subquery and reused for the percentage
+    query = """
     SELECT
-        station_id,
-        COUNT(*) as total_hours,
-        ROUND(SUM(rainfall_mm), 1) as total_rainfall_mm,
-        ROUND(AVG(rainfall_mm), 2) as avg_rainfall_per_hour,
-        ROUND(MAX(rainfall_mm), 1) as max_hourly_rainfall,
-        COUNT(CASE WHEN rainfall_mm > 0 THEN 1 END) as hours_with_rain,
-        ROUND(COUNT(CASE WHEN rainfall_mm > 0 THEN 1 END) * 100.0 / COUNT(*), 1) as pct_hours_with_rain
-    FROM '{silver_path}'
-    GROUP BY station_id
+        *,
+        ROUND(hours_with_rain * 100.0 / total_hours, 1) as pct_hours_with_rain
+    FROM (
+        SELECT
+            station_id,
+            CAST(SUM(hours) AS BIGINT) as total_hours,
+            ROUND(SUM(rain_sum), 1) as total_rainfall_mm,
+            ROUND(SUM(rain_sum) / SUM(rain_count), 2) as avg_rainfall_per_hour,
+            ROUND(MAX(rain_max), 1) as max_hourly_rainfall,
+            CAST(SUM(rain_hours) AS BIGINT) as hours_with_rain
+        FROM monthly
+        GROUP BY station_id
+    )
     ORDER BY total_rainfall_mm DESC
     """
 
-    result = con.execute(query).df()
-    print(result.to_string(index=False))
+    print_query(con, query)
     print()
 
     # Query 5: Data quality comparison
     print("\n5. DATA QUALITY COMPARISON BY STATION")
     print("-"*80)
 
-    query = f"""
+    query = """
     SELECT
-        station_id,
-        COUNT(*) as total_records,
-        ROUND(AVG(quality_score), 3) as avg_quality,
-        SUM(CASE WHEN has_outliers THEN 1 ELSE 0 END) as outlier_count,
-        ROUND(SUM(CASE WHEN has_outliers THEN 1 ELSE 0 END) * 100.0 / COUNT(*), 1) as outlier_pct
-    FROM '{silver_path}'
-    GROUP BY station_id
+        *,
+        ROUND(outlier_count * 100.0 / total_records, 1) as outlier_pct
+    FROM (
+        SELECT
+            station_id,
+            CAST(SUM(hours) AS BIGINT) as total_records,
+            ROUND(SUM(quality_sum) / SUM(quality_count), 3) as avg_quality,
+            CAST(SUM(outlier_count) AS BIGINT) as outlier_count
+        FROM monthly
+        GROUP BY station_id
+    )
     ORDER BY station_id
     """
 
-    result = con.execute(query).df()
-    print(result.to_string(index=False))
+    print_query(con, query)
     print()
 
     # Query 6: Wind comparison
     print("\n6. WIND STATISTICS BY STATION")
     print("-"*80)
 
-    query = f"""
+    query = """
     SELECT
         station_id,
-        ROUND(AVG(wind_speed_ms), 2) as avg_wind_speed_ms,
-        ROUND(MAX(wind_speed_ms), 1) as max_wind_speed_ms,
-        ROUND(MAX(wind_gust_ms), 1) as max_wind_gust_ms,
-        COUNT(CASE WHEN wind_speed_ms > 10 THEN 1 END) as hours_strong_wind
-    FROM '{silver_path}'
-    WHERE wind_speed_ms IS NOT NULL
+        ROUND(SUM(wind_sum) / SUM(wind_count), 2) as avg_wind_speed_ms,
+        ROUND(MAX(wind_max), 1) as max_wind_speed_ms,
+        ROUND(MAX(gust_max), 1) as max_wind_gust_ms,
+        CAST(SUM(strong_wind_hours) AS BIGINT) as hours_strong_wind
+    FROM monthly
     GROUP BY station_id
+    HAVING SUM(wind_count) > 0  -- Only stations that report wind speed
     ORDER BY avg_wind_speed_ms DESC
     """
 
-    result = con.execute(query).df()
-    print(result.to_string(index=False))
+    print_query(con, query)
     print()
 
     # Query 7: Seasonal comparison across stations
     print("\n7. SEASONAL TEMPERATURES BY STATION (2024)")
     print("-"*80)
 
-    query = f"""
+    query = """
     SELECT
         station_id,
         CASE
-            WHEN MONTH(timestamp) IN (12, 1, 2) THEN 'Winter'
-            WHEN MONTH(timestamp) IN (3, 4, 5) THEN 'Spring'
-            WHEN MONTH(timestamp) IN (6, 7, 8) THEN 'Summer'
+            WHEN month IN (12, 1, 2) THEN 'Winter'
+            WHEN month IN (3, 4, 5) THEN 'Spring'
+            WHEN month IN (6, 7, 8) THEN 'Summer'
             ELSE 'Fall'
         END as season,
-        ROUND(AVG(temperature_celsius), 2) as avg_temp,
-        ROUND(MIN(temperature_celsius), 2) as min_temp,
-        ROUND(MAX(temperature_celsius), 2) as max_temp,
-        ROUND(SUM(rainfall_mm), 1) as total_rainfall
-    FROM '{silver_path}'
-    WHERE YEAR(timestamp) = 2024
+        ROUND(SUM(temp_sum) / SUM(temp_count), 2) as avg_temp,
+        ROUND(MIN(temp_min), 2) as min_temp,
+        ROUND(MAX(temp_max), 2) as max_temp,
+        ROUND(SUM(rain_sum), 1) as total_rainfall
+    FROM monthly
+    WHERE year = 2024
     GROUP BY station_id, season
     ORDER BY station_id,
         CASE season
@@ -211,14 +306,47 @@ def demo_duckdb_queries():
         END
     """
 
-    result = con.execute(query).df()
-    print(result.to_string(index=False))
+    print_query(con, query)
     print()
 
     con.close()
 
 
-def demo_polars_analysis():
+def footer_null_counts(parquet_files):
+    """
+    Row count and per-column null counts from the Parquet footers
+
+    Counts come from the column chunk statistics, so no data pages are read.
+    Columns missing from some files count those files' rows as nulls.
+
+    Returns:
+        Tuple of (total_records, {column: null_count}), or None if a file
+        was written without null-count statistics
+    """
+    files = [str(f) for f in parquet_files]
+    con = duckdb.connect(config=DUCKDB_CONFIG)
+    try:
+        total_records = con.execute(
+            "SELECT SUM(num_rows) FROM parquet_file_metadata(?)", [files]
+        ).fetchone()[0]
+        column_stats = con.execute("""
+        SELECT
+            path_in_schema,
+            SUM(num_values) - SUM(stats_null_count) as non_null,
+            COUNT(*) - COUNT(stats_null_count) as chunks_without_stats
+        FROM parquet_metadata(?)
+        GROUP BY path_in_schema
+        ORDER BY MIN(column_id)
+        """, [files]).fetchall()
+    finally:
+        con.close()
+
+    if any(chunks_without_stats for _, _, chunks_without_stats in column_stats):
+        return None
+    return total_records, {col: total_records - non_null for col, non_null, _ in column_stats}
+
+
+def demo_polars_analysis(df, parquet_files):
     """Demonstrate Polars analysis on Silver data (Fast & Memory Efficient!)"""
 
     print("\n" + "="*80)
@@ -226,45 +354,12 @@ def demo_polars_analysis():
     print("="*80)
     print()
 
-    # Read all Silver data using Polars (scan_parquet is lazy, very efficient)
-    silver_path = SILVER_DIR / "weather_observations"
-
-    print(f"Loading data from: {silver_path}")
     print("Using Polars lazy scanning (efficient for large datasets)...\n")
 
-    # Read all parquet files (handle schema variations)
-    start_time = time.time()
-    # Get all parquet files and read them individually
-    parquet_files = list(silver_path.rglob("*.parquet"))
-    dfs = []
-
-    for parquet_file in parquet_files:
-        file_df = pl.read_parquet(parquet_file)
-        # Cast problematic columns to consistent types
-        if "cloud_cover_octas" in file_df.columns:
-            file_df = file_df.with_columns(pl.col("cloud_cover_octas").cast(pl.Float64, strict=False))
-        if "visibility_m" in file_df.columns:
-            file_df = file_df.with_columns(pl.col("visibility_m").cast(pl.Float64, strict=False))
-        if "radiation_index" in file_df.columns:
-            file_df = file_df.with_columns(pl.col("radiation_index").cast(pl.Float64, strict=False))
-        dfs.append(file_df)
-
-    # Concatenate with schema alignment (fills missing columns with nulls)
-    df_eager = pl.concat(dfs, how="vertical_relaxed")
-    # Remove duplicate columns if they exist (can happen with schema mismatches)
-    seen_cols = []
-    for col in df_eager.columns:
-        if col not in seen_cols:
-            seen_cols.append(col)
-    if len(seen_cols) < len(df_eager.columns):
-        df_eager = df_eager.select(seen_cols)
-    df = df_eager.lazy()  # Convert to lazy for efficient queries
-
+    # Build all analyses as lazy plans and run them in one collect_all: Polars
+    # executes them together, sharing the scan of the columns they have in common
     # Analysis 1: Basic statistics per station
-    print("1. STATISTICS BY STATION (Polars)")
-    print("-"*80)
-
-    result = (
+    station_stats = (
         df.group_by("station_id")
         .agg([
             pl.count("timestamp").alias("total_hours"),
@@ -275,18 +370,10 @@ def demo_polars_analysis():
             pl.col("quality_score").mean().round(3).alias("avg_quality")
         ])
         .sort("station_id")
-        .collect()  # Execute the lazy query
     )
 
-    load_time = time.time() - start_time
-    print(result.to_pandas().to_string(index=False))
-    print(f"\nQuery executed in {load_time:.3f} seconds\n")
-
     # Analysis 2: Temperature distribution comparison
-    print("\n2. TEMPERATURE DISTRIBUTION BY STATION")
-    print("-"*80)
-
-    result = (
+    temp_distribution = (
         df.group_by("station_id")
         .agg([
             pl.col("temperature_celsius").quantile(0.25).round(2).alias("q25_temp"),
@@ -295,43 +382,18 @@ def demo_polars_analysis():
             pl.col("temperature_celsius").std().round(2).alias("std_temp")
         ])
         .sort("station_id")
-        .collect()
     )
 
-    print(result.to_pandas().to_string(index=False))
-    print()
-
     # Analysis 3: Correlation analysis
-    print("\n3. CORRELATION MATRIX - WEATHER VARIABLES")
-    print("-"*80)
-
-    # Collect data for correlation (need to compute on actual data)
-    df_collected = (
-        df.select([
-            "temperature_celsius",
-            "humidity_percent",
-            "rainfall_mm",
-            "wind_speed_ms"
-        ])
-        .collect()
-    )
-
-    # Compute correlations
-    corr_matrix = df_collected.select([
+    correlations = df.select([
         pl.corr("temperature_celsius", "humidity_percent").alias("temp_humidity"),
         pl.corr("temperature_celsius", "rainfall_mm").alias("temp_rainfall"),
         pl.corr("humidity_percent", "rainfall_mm").alias("humidity_rainfall"),
         pl.corr("wind_speed_ms", "rainfall_mm").alias("wind_rainfall")
     ])
 
-    print(corr_matrix.to_pandas().to_string(index=False))
-    print()
-
     # Analysis 4: Top rainy days across all stations
-    print("\n4. TOP 10 RAINIEST DAYS (ALL STATIONS)")
-    print("-"*80)
-
-    result = (
+    rainiest_days = (
         df.with_columns([
             pl.col("timestamp").dt.date().alias("date")
         ])
@@ -341,36 +403,62 @@ def demo_polars_analysis():
         ])
         .sort("daily_rainfall", descending=True)
         .head(10)
-        .collect()
     )
 
-    print(result.to_pandas().to_string(index=False))
+    # Analysis 5: Missing data analysis, from the Parquet footer statistics
+    # when available, otherwise counted by Polars with the other analyses
+    footer_counts = footer_null_counts(parquet_files)
+    plans = [station_stats, temp_distribution, correlations, rainiest_days]
+    if footer_counts is None:
+        plans += [df.select(pl.len()), df.null_count()]
+
+    start_time = time.time()
+    results = pl.collect_all(plans)
+    query_time = time.time() - start_time
+
+    station_stats, temp_distribution, corr_matrix, rainiest_days = results[:4]
+    if footer_counts is None:
+        row_count, null_frame = results[4:]
+        footer_counts = (
+            row_count.item(),
+            {col: null_frame[col][0] for col in null_frame.columns}
+        )
+
+    print("1. STATISTICS BY STATION (Polars)")
+    print("-"*80)
+    print(station_stats.to_pandas().to_string(index=False))
+    print(f"\nAll analyses executed in {query_time:.3f} seconds\n")
+
+    print("\n2. TEMPERATURE DISTRIBUTION BY STATION")
+    print("-"*80)
+    print(temp_distribution.to_pandas().to_string(index=False))
     print()
 
-    # Analysis 5: Missing data analysis
-    print("\n5. MISSING DATA ANALYSIS")
+    print("\n3. CORRELATION MATRIX - WEATHER VARIABLES")
+    print("-"*80)
+    print(corr_matrix.to_pandas().to_string(index=False))
+    print()
+
+    print("\n4. TOP 10 RAINIEST DAYS (ALL STATIONS)")
     print("-"*80)
+    print(rainiest_days.to_pandas().to_string(index=False))
+    print()
 
-    total_records = df.select(pl.len()).collect().item()
+    print("\n5. MISSING DATA ANALYSIS")
+    print("-"*80)
 
-    null_counts = (
-        df.select([
-            pl.col("*").null_count()
-        ])
-        .collect()
-    )
+    total_records, null_counts = footer_counts
 
     # Convert to percentage
     print(f"Total records: {total_records:,}\n")
-    for col in null_counts.columns:
-        null_count = null_counts[col][0]
+    for col, null_count in null_counts.items():
         if null_count > 0:
             pct = (null_count / total_records) * 100
             print(f"{col:30s}: {null_count:6d} ({pct:5.1f}%)")
     print()
 
 
-def demo_pandas_analysis():
+def demo_pandas_analysis(df):
     """Demonstrate Pandas analysis on Silver data"""
 
     print("\n" + "="*80)
@@ -378,23 +466,7 @@ def demo_pandas_analysis():
     print("="*80)
     print()
 
-    # Read all Silver data into pandas
-    silver_path = SILVER_DIR / "weather_observations"
-    parquet_files = list(silver_path.rglob("*.parquet"))
-
-    print(f"Loading {len(parquet_files)} Parquet files...\n")
-
-    # Read all files
-    start_time = time.time()
-    dfs = [pd.read_parquet(f) for f in parquet_files]
-    df = pd.concat(dfs, ignore_index=True)
-    load_time = time.time() - start_time
-
-    # Convert timestamp to datetime if needed
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
-
     print(f"Total records loaded: {len(df):,}")
-    print(f"Load time: {load_time:.3f} seconds")
     print(f"Memory usage: {df.memory_usage(deep=True).sum() / 1024**2:.1f} MB\n")
 
     # Analysis 1: Temperature statistics by station
@@ -421,14 +493,21 @@ def demo_pandas_analysis():
     # Analysis 3: Top windiest hours across all stations
     print("\n3. TOP 10 WINDIEST HOURS (ALL STATIONS)")
     print("-"*80)
-    windiest = df.nlargest(10, 'wind_speed_ms')[[
+    # Partial selection on the wind column alone (O(n), no sort of the frame),
+    # then gather only the 10 rows. Ties keep row order, as nlargest does
+    wind = df['wind_speed_ms'].to_numpy(dtype='float64', na_value=-np.inf)
+    k = min(10, len(wind))
+    kth_largest = np.partition(wind, len(wind) - k)[len(wind) - k]
+    top = np.flatnonzero((wind >= kth_largest) & (wind > -np.inf))
+    top = top[np.argsort(-wind[top], kind='stable')][:k]
+    windiest = df.iloc[top][[
         'station_id', 'timestamp', 'wind_speed_ms', 'wind_gust_ms', 'wind_direction_degrees'
     ]]
     print(windiest.to_string(index=False))
     print()
 
 
-def compare_performance():
+def compare_performance(df_pandas, lf_polars, parquet_files, pandas_time):
     """Compare performance between Polars and Pandas
 
     Note: For this small dataset (32K rows), performance differences are minimal.
@@ -440,45 +519,17 @@ def compare_performance():
     print("="*80)
     print()
 
-    silver_path = SILVER_DIR / "weather_observations"
-    parquet_files = list(silver_path.rglob("*.parquet"))
-
-    print(f"Dataset: {len(parquet_files)} Parquet files, 32K rows\n")
+    print(f"Dataset: {len(parquet_files)} Parquet files, {len(df_pandas):,} rows\n")
     print("Note: Polars' advantages become more apparent with larger datasets.")
     print("The Polars lazy query demo above shows its true power!\n")
 
-    # Test 1: Load time (use Pandas for both since we're comparing loading methods)
+    # Test 1: Load time. Pandas was timed in load_all(); Polars materializes
+    # the same columns from its lazy scan
     print("Test 1: Data Loading Speed")
     print("-"*40)
 
-    # Pandas - traditional approach
-    start = time.time()
-    dfs_pandas = [pd.read_parquet(f) for f in parquet_files]
-    df_pandas = pd.concat(dfs_pandas, ignore_index=True)
-    pandas_time = time.time() - start
-
-    # Polars - lazy approach (more representative of real-world usage)
     start = time.time()
-    # Read all files individually to avoid schema issues, then concat
-    dfs_polars = []
-    for parquet_file in parquet_files:
-        file_df = pl.read_parquet(parquet_file)
-        # Cast to consistent types (stations have different schemas)
-        if "cloud_cover_octas" in file_df.columns:
-            file_df = file_df.with_columns(pl.col("cloud_cover_octas").cast(pl.Float64, strict=False))
-        if "visibility_m" in file_df.columns:
-            file_df = file_df.with_columns(pl.col("visibility_m").cast(pl.Float64, strict=False))
-        if "radiation_index" in file_df.columns:
-            file_df = file_df.with_columns(pl.col("radiation_index").cast(pl.Float64, strict=False))
-        dfs_polars.append(file_df)
-    df_polars = pl.concat(dfs_polars, how="vertical_relaxed")
-    # Remove duplicate columns if they exist
-    seen_cols = []
-    for col in df_polars.columns:
-        if col not in seen_cols:
-            seen_cols.append(col)
-    if len(seen_cols) < len(df_polars.columns):
-        df_polars = df_polars.select(seen_cols)
+    df_polars = lf_polars.select(list(df_pandas.columns)).collect()
     polars_time = time.time() - start
 
     print(f"Pandas:  {pandas_time:.3f} seconds")
@@ -522,6 +573,109 @@ def compare_performance():
     print()
 
 
+def scan_polars(parquet_files):
+    """Lazily scan the Silver files as one Polars LazyFrame (handles schema variations)"""
+    # Union of the file schemas (footers only, no data is read), with each
+    # column widened to the supertype of its per-file dtypes; older files
+    # store these columns as integers, so they are read as Float64 throughout
+    with ThreadPoolExecutor(max_workers=FOOTER_READ_WORKERS) as executor:
+        file_schemas = list(executor.map(pl.read_parquet_schema, parquet_files))
+    schema = dict(pl.concat(
+        [pl.DataFrame(schema=file_schema) for file_schema in file_schemas],
+        how="diagonal_relaxed"
+    ).schema)
+    for col in ("cloud_cover_octas", "visibility_m", "radiation_index"):
+        if col in schema:
+            schema[col] = pl.Float64
+
+    # station_id comes from the files, not the hive directories, which use
+    # underscores instead of dashes
+    return pl.scan_parquet(
+        parquet_files,
+        schema=schema,
+        hive_partitioning=False,
+        missing_columns="insert",
+        cast_options=pl.ScanCastOptions(integer_cast=["upcast", "allow-float"], float_cast="upcast")
+    )
+
+
+def load_silver_cached(silver_path, parquet_files):
+    """
+    Consolidated Arrow IPC copy of the Silver layer, rebuilt when Silver changes
+
+    Reading one file is much faster than opening every monthly partition, and
+    Silver only changes when transform_silver.py rewrites it. The cache is
+    keyed by the number of Silver files and their newest mtime.
+
+    Returns:
+        Path to the cache file
+    """
+    newest = max(f.stat().st_mtime_ns for f in parquet_files)
+    cache_dir = silver_path / ".cache"
+    cache_path = cache_dir / f"silver_{len(parquet_files)}_{newest}.arrow"
+    if cache_path.exists():
+        return cache_path
+
+    # Drop caches of earlier Silver versions
+    cache_dir.mkdir(exist_ok=True)
+    for old_cache in cache_dir.glob("silver_*.arrow"):
+        old_cache.unlink()
+
+    print("Building consolidated cache (first run after a Silver update)...")
+    table = scan_polars(parquet_files).collect().to_arrow()
+
+    # Write to a temporary file first so an interrupted run leaves no partial cache
+    temp_path = cache_path.with_suffix(".part")
+    options = pa.ipc.IpcWriteOptions(compression="lz4")
+    with pa.ipc.new_file(str(temp_path), table.schema, options=options) as writer:
+        writer.write_table(table)
+    os.replace(temp_path, cache_path)
+    return cache_path
+
+
+def load_pandas(cache_path):
+    """Read the columns the Pandas demo uses into one DataFrame"""
+    # Only the columns used below are read from the cache. Columns stay
+    # Arrow-backed (pd.ArrowDtype, as with dtype_backend="pyarrow"): no
+    # conversion to NumPy and no Python string objects for station_id
+    table = ds.dataset(str(cache_path), format="ipc").to_table(columns=[
+        'station_id', 'timestamp', 'temperature_celsius', 'humidity_percent',
+        'rainfall_mm', 'wind_speed_ms', 'wind_gust_ms', 'wind_direction_degrees'
+    ])
+    df = table.to_pandas(types_mapper=pd.ArrowDtype)
+
+    # Only a handful of stations: group by integer category codes instead
+    # of hashing the id strings in every analysis
+    df['station_id'] = df['station_id'].astype('category')
+    return df
+
+
+def load_all():
+    """
+    Load the Silver data once for the Polars, Pandas and comparison demos
+
+    Returns:
+        Tuple of (parquet_files, df_pandas, lf_polars, pandas_load_time)
+    """
+    silver_path = SILVER_DIR / "weather_observations"
+    parquet_files = sorted(silver_path.rglob("*.parquet"))
+
+    print(f"\nLoading {len(parquet_files)} Parquet files from: {silver_path}")
+    cache_path = load_silver_cached(silver_path, parquet_files)
+
+    start = time.time()
+    df_pandas = load_pandas(cache_path)
+    pandas_time = time.time() - start
+
+    # Polars stays lazy: each analysis reads only the columns it needs.
+    # station_id is categorical for the same reason as in load_pandas
+    lf_polars = pl.scan_ipc(cache_path).with_columns(pl.col("station_id").cast(pl.Categorical))
+
+    print(f"Load time: {pandas_time:.3f} seconds")
+
+    return parquet_files, df_pandas, lf_polars, pandas_time
+
+
 def main():
     """Run all demos"""
 
@@ -544,14 +698,17 @@ def main():
     # Run DuckDB demos
     demo_duckdb_queries()
 
+    # Load once, shared by the remaining demos
+    parquet_files, df_pandas, lf_polars, pandas_load_time = load_all()
+
     # Run Polars demos
-    demo_polars_analysis()
+    demo_polars_analysis(lf_polars, parquet_files)
 
     # Run Pandas demos
-    demo_pandas_analysis()
+    demo_pandas_analysis(df_pandas)
 
     # Performance comparison
-    compare_performance()
+    compare_performance(df_pandas, lf_polars, parquet_files, pandas_load_time)
 
     print("\n" + "="*80)
     print("DEMO COMPLETE!")
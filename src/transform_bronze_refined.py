@@ -5,18 +5,46 @@ Flattens Bronze Raw JSON into Parquet format for efficient querying.
 Uses schema-on-read approach - no fixed schema enforcement.
 All fields from source are preserved dynamically.
 
+Each Bronze Raw file holds one station-year (as written by the bronze_raw
+orchestrator) and is split into one Parquet file per month.
+
 Usage:
     python transform_bronze_refined.py --station hupsel --year 2024
 """
 
+import io
 import os
-import json
 import argparse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from contextlib import redirect_stdout
 from pathlib import Path
 from datetime import datetime
-import pandas as pd
+import numpy as np
+import orjson
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 from config import BRONZE_RAW_DIR, BRONZE_REFINED_DIR, STATIONS
 
+# Monthly files of one year are independent; pyarrow releases the GIL while
+# encoding and writing, so they can go to disk concurrently
+PARQUET_WRITE_WORKERS = 4
+
+# Bronze Raw files (station-years) are independent and parsing/flattening is
+# CPU-bound, so files are transformed in separate processes
+FILE_WORKERS = os.cpu_count() or 1
+
+# Parquet data page size (1 MiB): fewer, larger pages per column chunk
+PARQUET_DATA_PAGE_SIZE = 1 << 20
+
+# Fixed refined types: coordinates keep full precision, identification and
+# tracking columns are text, and every other column is a float32 measurement
+COORDINATE_COLUMNS = ("longitude", "latitude")
+TEXT_COLUMNS = ("location_id", "_source_file", "_ingestion_timestamp", "_source_api")
+
+# Bumped whenever the refined types change, so older year caches are rebuilt
+YEAR_CACHE_VERSION = 2
+
 
 class BronzeRefinedTransformer:
     """Transforms Bronze Raw JSON to Bronze Refined Parquet"""
@@ -26,33 +54,70 @@ class BronzeRefinedTransformer:
         self.station_config = STATIONS[station_key]
         self.station_id = self.station_config["id"]
 
+        # Station partition directories, built once per transformer
+        station_dir = self.station_id.replace('-', '_')
+        self.raw_dirs = (
+            BRONZE_RAW_DIR / "edr_api" / f"station_id={self.station_id}",
+            BRONZE_RAW_DIR / "edr_api" / f"station_id={station_dir}"
+        )
+        self.refined_dir = BRONZE_REFINED_DIR / "weather_observations" / f"station_id={station_dir}"
+        self.cache_dir = BRONZE_REFINED_DIR / "_yearcache" / f"station_id={station_dir}"
+
     def find_bronze_raw_files(self, year=None):
         """Find all Bronze Raw JSON files for this station"""
-        station_dir = self.station_id.replace('-', '_')
-        base_path = BRONZE_RAW_DIR / "edr_api" / f"station_id={station_dir}"
+        # Two layouts exist, both with one directory per year:
+        # - bronze_raw orchestrator: edr_api/station_id={id}/year={year}/data.json
+        # - legacy v2 ingester: edr_api/station_id={id, underscores}/year={year}/{start}_to_{end}.json
+        # The depth is fixed, so only the year directories are listed instead
+        # of walking the whole station tree
+        json_files = []
+
+        for base_path in self.raw_dirs:
+            if year:
+                year_dirs = [f"year={year}"]
+            else:
+                try:
+                    with os.scandir(base_path) as entries:
+                        year_dirs = [
+                            entry.name for entry in entries
+                            if entry.name.startswith("year=") and entry.is_dir()
+                        ]
+                except FileNotFoundError:
+                    continue
 
-        if year:
-            search_path = base_path / f"year={year}"
-        else:
-            search_path = base_path
+            for year_dir in year_dirs:
+                try:
+                    with os.scandir(base_path / year_dir) as entries:
+                        json_files.extend(
+                            base_path / year_dir / entry.name for entry in entries
+                            if entry.name.endswith(".json") and entry.is_file()
+                        )
+                except FileNotFoundError:
+                    continue
 
-        json_files = list(search_path.rglob("*.json"))
         return sorted(json_files)
 
     def flatten_edr_coverage(self, coverage_data):
         """
-        Flatten EDR CoverageJSON format to tabular rows
+        Flatten EDR CoverageJSON format to a table
+
+        Each coverage array (one list per parameter) becomes an Arrow column
+        directly, with its type inferred once per column; no intermediate
+        rows or pandas DataFrame are built.
 
         Args:
             coverage_data: The 'data' section from Bronze Raw JSON
 
         Returns:
-            List of flat dictionaries (rows)
+            Arrow table with one row per timestamp (empty if there is no data)
         """
-        rows = []
+        tables = []
 
-        # Extract coverages
-        coverages = coverage_data.get("coverages", [])
+        # Extract coverages (single-station responses may be a bare Coverage)
+        if coverage_data.get("type") == "Coverage":
+            coverages = [coverage_data]
+        else:
+            coverages = coverage_data.get("coverages", [])
 
         for coverage in coverages:
             # Get domain (coordinates and timestamps)
@@ -64,84 +129,225 @@ class BronzeRefinedTransformer:
             y_coords = axes.get("y", {}).get("values", [])
             timestamps = axes.get("t", {}).get("values", [])
 
-            # Get station ID if available
-            location_id = coverage.get("eumetnet:locationId")
+            n_rows = len(timestamps)
+            if n_rows == 0:
+                continue
 
-            # Extract ranges (the actual data values)
-            ranges = coverage.get("ranges", {})
+            # Point series: coordinates and station ID repeat on every row, so
+            # they are filled natively instead of from per-row Python lists
+            columns = {
+                "timestamp": timestamps,
+                "longitude": pa.repeat(x_coords[0] if x_coords else None, n_rows),
+                "latitude": pa.repeat(y_coords[0] if y_coords else None, n_rows),
+                "location_id": pa.repeat(coverage.get("eumetnet:locationId"), n_rows)
+            }
+
+            # Add all parameter value arrays (the actual data), aligned to the
+            # timestamps; short arrays are padded with missing values
+            for param_name, param_data in coverage.get("ranges", {}).items():
+                values = param_data.get("values", [])
+                if not values:
+                    continue
+                if len(values) < n_rows:
+                    values = values + [None] * (n_rows - len(values))
+                # Store with original parameter name - no schema enforcement!
+                columns[param_name] = values[:n_rows]
 
-            # For each timestamp, create a row
-            for i, timestamp in enumerate(timestamps):
-                row = {
-                    "timestamp": timestamp,
-                    "longitude": x_coords[0] if x_coords else None,
-                    "latitude": y_coords[0] if y_coords else None,
-                    "location_id": location_id
-                }
+            tables.append(pa.table(columns))
 
-                # Add all parameter values for this timestamp
-                for param_name, param_data in ranges.items():
-                    values = param_data.get("values", [])
-                    if i < len(values):
-                        # Store with original parameter name - no schema enforcement!
-                        row[param_name] = values[i]
+        if not tables:
+            return pa.table({})
+        if len(tables) == 1:
+            return tables[0]
+        # Coverages may carry different parameters; missing ones become nulls
+        return pa.concat_tables(tables, promote_options="permissive")
 
-                rows.append(row)
+    def cast_column(self, name, column):
+        """
+        Cast one inferred column to its fixed refined type
 
-        return rows
+        The type depends only on the column, never on the values of a year,
+        so every year partition has the same schema: coordinates float64,
+        text columns large_string and measurements float32 (one decimal;
+        integer code columns are exact in float32, gaps become nulls).
+        """
+        if name in TEXT_COLUMNS or pa.types.is_string(column.type):
+            return column.cast(pa.large_string())
+        if name in COORDINATE_COLUMNS:
+            return column.cast(pa.float64())
+        return column.cast(pa.float32())
+
+    def get_cache_path(self, json_path):
+        """
+        Path of the cache for one Bronze Raw file
+
+        The cache is named after the file's year and name (a year may hold
+        several chunk files) and keyed by its size and mtime, so a
+        re-ingested file is parsed again, and by YEAR_CACHE_VERSION.
+        """
+        stat = json_path.stat()
+        return self.cache_dir / (
+            f"{self.cache_prefix(json_path)}_{stat.st_size}_{stat.st_mtime_ns}_v{YEAR_CACHE_VERSION}.arrow"
+        )
+
+    def cache_prefix(self, json_path):
+        """Cache file name prefix shared by all versions of one Bronze Raw file"""
+        return f"{json_path.parent.name}_{json_path.stem}"
+
+    def write_cache(self, table, json_path, cache_path):
+        """Store a parsed file as LZ4-compressed Arrow IPC, replacing older versions"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for old_cache in self.cache_dir.glob(f"{self.cache_prefix(json_path)}_*.arrow"):
+            old_cache.unlink()
+
+        # Write to a temporary file first so an interrupted run leaves no partial cache
+        temp_path = cache_path.with_suffix(".part")
+        options = pa.ipc.IpcWriteOptions(compression="lz4")
+        with pa.ipc.new_file(str(temp_path), table.schema, options=options) as writer:
+            writer.write_table(table)
+        os.replace(temp_path, cache_path)
 
     def transform_file(self, json_path):
-        """Transform a single Bronze Raw JSON file"""
-        print(f"  Reading: {json_path.name}")
+        """
+        Transform a single Bronze Raw JSON file
 
-        # Read Bronze Raw JSON
-        with open(json_path, 'r', encoding='utf-8') as f:
-            bronze_raw = json.load(f)
+        The parsed year is cached as Arrow IPC, so re-runs over an unchanged
+        file read the table back instead of parsing the JSON again.
+        """
+        print(f"  Reading: {json_path.name}")
 
-        metadata = bronze_raw.get("_metadata", {})
-        data = bronze_raw.get("data", {})
+        cache_path = self.get_cache_path(json_path)
+        if cache_path.exists():
+            with pa.OSFile(str(cache_path)) as source:
+                table = pa.ipc.open_file(source).read_all()
+            print(f"    [OK] Loaded {table.num_rows} rows, {table.num_columns} columns from year cache")
+            return table
+
+        # Read Bronze Raw JSON (orjson parses bytes directly, several times
+        # faster than the stdlib json module on these multi-MB files)
+        with open(json_path, 'rb') as f:
+            bronze_raw = orjson.loads(f.read())
+
+        # Orchestrator files hold the bare API response, older ingesters
+        # wrapped it as {"_metadata": ..., "data": ...}
+        if "_metadata" in bronze_raw:
+            metadata = bronze_raw["_metadata"]
+            data = bronze_raw.get("data", {})
+        else:
+            metadata = {}
+            data = bronze_raw
 
-        # Flatten to tabular format
-        rows = self.flatten_edr_coverage(data)
+        # Flatten to an Arrow table (schema inferred automatically!)
+        table = self.flatten_edr_coverage(data)
 
-        if not rows:
+        if table.num_rows == 0:
             print(f"    [WARN] No data rows extracted")
             return None
 
-        # Convert to DataFrame (schema inferred automatically!)
-        df = pd.DataFrame(rows)
+        # Add tracking metadata (constant per file; the Parquet writer
+        # dictionary-encodes such columns to a single entry)
+        n_rows = table.num_rows
+        table = table.append_column('_source_file', pa.repeat(str(json_path), n_rows))
+        table = table.append_column('_ingestion_timestamp', pa.repeat(metadata.get('ingestion_timestamp'), n_rows))
+        table = table.append_column('_source_api', pa.repeat(metadata.get('source_api', 'KNMI EDR API'), n_rows))
+
+        # Convert timestamp to datetime (CoverageJSON timestamps are ISO 8601
+        # with a zone designator, which Arrow's cast parses natively) and
+        # give the other columns their fixed types
+        columns = {}
+        for name, column in zip(table.column_names, table.columns):
+            if name == 'timestamp':
+                columns[name] = column.cast(pa.timestamp('us', tz='UTC'))
+            else:
+                columns[name] = self.cast_column(name, column)
+        table = pa.table(columns)
+        self.write_cache(table, json_path, cache_path)
+
+        print(f"    [OK] Extracted {table.num_rows} rows, {table.num_columns} columns")
+        print(f"    Columns: {', '.join(table.column_names[:10])}{'...' if table.num_columns > 10 else ''}")
+
+        return table
+
+    def get_output_path(self, year, month):
+        """Generate output path for one month of refined Parquet"""
+        # Directory structure; created by write_parquet when the month is written
+        output_dir = self.refined_dir / f"year={year}" / f"month={month:02d}"
 
-        # Add tracking metadata
-        df['_source_file'] = str(json_path)
-        df['_ingestion_timestamp'] = metadata.get('ingestion_timestamp')
-        df['_source_api'] = metadata.get('source_api')
+        # Output filename
+        output_file = output_dir / "data.parquet"
+        return output_file
 
-        # Convert timestamp to datetime
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
+    def split_by_month(self, table):
+        """
+        Split one year of refined data into monthly Arrow tables
 
-        print(f"    [OK] Extracted {len(df)} rows, {len(df.columns)} columns")
-        print(f"    Columns: {', '.join(df.columns[:10])}{'...' if len(df.columns) > 10 else ''}")
+        Each month is a zero-copy slice of the year's table, instead of one
+        boolean mask per month.
 
-        return df
+        Returns:
+            List of (month, table) tuples in month order
+        """
+        months = pc.month(table['timestamp']).to_numpy()
+
+        # Rows normally arrive in time order; otherwise group them by month
+        # with a stable sort, so rows keep their order within each month
+        if (np.diff(months) < 0).any():
+            order = np.argsort(months, kind='stable')
+            table = table.take(order)
+            months = months[order]
+
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(months)) + 1))
+        ends = np.append(starts[1:], len(months))
+        return [
+            (int(months[start]), table.slice(start, end - start))
+            for start, end in zip(starts, ends)
+        ]
+
+    def write_parquet(self, month_table, output_path):
+        """Write one month of refined data to Parquet (zstd, with footer statistics)"""
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(
+            month_table,
+            output_path,
+            compression='zstd',
+            compression_level=3,
+            use_dictionary=True,
+            data_page_size=PARQUET_DATA_PAGE_SIZE,
+            write_statistics=True
+        )
+
+    def process_file(self, json_path):
+        """
+        Transform one Bronze Raw file and write its monthly Parquet files
 
-    def get_output_path(self, json_path):
-        """Generate output path for refined Parquet file"""
-        # Extract date from filename
-        filename = json_path.stem  # e.g., "20240101_to_20240131"
-        parts = filename.split("_to_")
-        start_date = parts[0]
+        Returns:
+            True if files were written, False if skipped or failed
+        """
+        try:
+            # Transform to an Arrow table
+            table = self.transform_file(json_path)
 
-        year = start_date[:4]
-        month = start_date[4:6]
+            if table is None or table.num_rows == 0:
+                return False
 
-        # Create directory structure
-        station_dir = self.station_id.replace('-', '_')
-        output_dir = BRONZE_REFINED_DIR / "weather_observations" / f"station_id={station_dir}" / f"year={year}" / f"month={month}"
-        output_dir.mkdir(parents=True, exist_ok=True)
+            # Split the year into monthly partitions
+            file_year = int(json_path.parent.name.split("=")[1])
+            writes = [
+                (month_table, self.get_output_path(file_year, month))
+                for month, month_table in self.split_by_month(table)
+            ]
 
-        # Output filename
-        output_file = output_dir / f"{filename}.parquet"
-        return output_file
+            # Save all months of the year concurrently
+            with ThreadPoolExecutor(max_workers=PARQUET_WRITE_WORKERS) as executor:
+                list(executor.map(lambda write: self.write_parquet(*write), writes))
+
+            total_size = sum(os.path.getsize(output_path) for _, output_path in writes)
+            print(f"    [SUCCESS] Saved {len(writes)} monthly files ({total_size:,} bytes)\n")
+            return True
+
+        except Exception as e:
+            print(f"    [ERROR] Failed to transform: {e}\n")
+            return False
 
     def transform(self, year=None):
         """
@@ -165,30 +371,26 @@ class BronzeRefinedTransformer:
         print(f"Station: {self.station_config['name']} ({self.station_id})\n")
 
         transformed = 0
+        workers = min(FILE_WORKERS, len(json_files))
 
-        # Transform each file
-        for i, json_path in enumerate(json_files, 1):
-            print(f"[{i}/{len(json_files)}] {json_path.parent.name}/{json_path.name}")
-
-            try:
-                # Transform to DataFrame
-                df = self.transform_file(json_path)
-
-                if df is None or df.empty:
-                    continue
-
-                # Save to Parquet
-                output_path = self.get_output_path(json_path)
-                df.to_parquet(output_path, index=False, engine='pyarrow')
-
-                file_size = os.path.getsize(output_path)
-                print(f"    [SUCCESS] Saved {file_size:,} bytes to {output_path.name}\n")
-
-                transformed += 1
-
-            except Exception as e:
-                print(f"    [ERROR] Failed to transform: {e}\n")
-                continue
+        if workers == 1:
+            for i, json_path in enumerate(json_files, 1):
+                print(f"[{i}/{len(json_files)}] {json_path.parent.name}/{json_path.name}")
+                transformed += self.process_file(json_path)
+        else:
+            # Each worker buffers its file's log, printed as a block once the
+            # file is done so output of concurrent files does not interleave
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {
+                    executor.submit(_process_file, self.station_key, json_path): json_path
+                    for json_path in json_files
+                }
+                for i, future in enumerate(as_completed(futures), 1):
+                    json_path = futures[future]
+                    ok, log = future.result()
+                    print(f"[{i}/{len(json_files)}] {json_path.parent.name}/{json_path.name}")
+                    print(log, end="")
+                    transformed += ok
 
         print("="*80)
         print(f"[COMPLETE] Transformed {transformed}/{len(json_files)} files")
@@ -196,6 +398,14 @@ class BronzeRefinedTransformer:
         print("="*80)
 
 
+def _process_file(station_key, json_path):
+    """Worker process entry point: transform one file, returning (ok, log)"""
+    log = io.StringIO()
+    with redirect_stdout(log):
+        ok = BronzeRefinedTransformer(station_key).process_file(json_path)
+    return ok, log.getvalue()
+
+
 def main():
     parser = argparse.ArgumentParser(description="Transform Bronze Raw to Bronze Refined")
     parser.add_argument(
@@ -12,11 +12,13 @@ Usage:
 import os
 import argparse
 from pathlib import Path
-from datetime import datetime
-import pandas as pd
-import numpy as np
+from datetime import datetime, timezone
+import polars as pl
 from config import BRONZE_REFINED_DIR, SILVER_DIR, STATIONS
 
+# Parquet data page size (1 MiB): fewer, larger pages per column chunk
+PARQUET_DATA_PAGE_SIZE = 1 << 20
+
 
 class SilverTransformer:
     """Transforms Bronze Refined to Silver layer with data quality"""
@@ -50,6 +52,43 @@ class SilverTransformer:
         "radiation_index": "Int64",                 # IX
     }
 
+    # KNMI reports the measurements with one decimal; Bronze Refined stores
+    # them as float32, which is exact to that precision
+    MEASUREMENT_DECIMALS = 1
+
+    # Polars dtypes enforcing the SILVER_SCHEMA types; the timestamp keeps
+    # the UTC datetime read from Bronze Refined
+    POLARS_DTYPES = {
+        "string": pl.String,
+        "float64": pl.Float64,
+        "Int64": pl.Int64,
+    }
+
+    # Mapping from Bronze Refined names to Silver names
+    COLUMN_MAPPING = {
+        "timestamp": "timestamp",
+        "location_id": "station_id",
+        "latitude": "latitude",
+        "longitude": "longitude",
+        "T": "temperature_celsius",
+        "T10N": "temperature_min_celsius",
+        "TD": "dewpoint_celsius",
+        "U": "humidity_percent",
+        "RH": "rainfall_mm",
+        "DR": "rainfall_duration_minutes",
+        "DD": "wind_direction_degrees",
+        "FF": "wind_speed_ms",
+        "FX": "wind_gust_ms",
+        "FH": "wind_speed_hourly_ms",
+        "Q": "solar_radiation_jcm2",
+        "SQ": "sunshine_duration_minutes",
+        "VV": "visibility_m",
+        "N": "cloud_cover_octas",
+        "WW": "weather_code",
+        "EE": "evaporation_mm",
+        "IX": "radiation_index",
+    }
+
     # Data quality thresholds
     THRESHOLDS = {
         "temperature_celsius": (-50, 50),
@@ -64,10 +103,14 @@ class SilverTransformer:
         self.station_config = STATIONS[station_key]
         self.station_id = self.station_config["id"]
 
+        # Station partition directories, built once per transformer
+        station_dir = self.station_id.replace('-', '_')
+        self.refined_dir = BRONZE_REFINED_DIR / "weather_observations" / f"station_id={station_dir}"
+        self.silver_dir = SILVER_DIR / "weather_observations" / f"station_id={station_dir}"
+
     def find_bronze_refined_files(self, year=None):
         """Find all Bronze Refined Parquet files for this station"""
-        station_dir = self.station_id.replace('-', '_')
-        base_path = BRONZE_REFINED_DIR / "weather_observations" / f"station_id={station_dir}"
+        base_path = self.refined_dir
 
         if year:
             search_path = base_path / f"year={year}"
@@ -83,115 +126,167 @@ class SilverTransformer:
 
         This is where we enforce the fixed schema!
         """
-        # Create mapping from Bronze names to Silver names
-        column_mapping = {
-            "timestamp": "timestamp",
-            "location_id": "station_id",
-            "latitude": "latitude",
-            "longitude": "longitude",
-            "T": "temperature_celsius",
-            "T10N": "temperature_min_celsius",
-            "TD": "dewpoint_celsius",
-            "U": "humidity_percent",
-            "RH": "rainfall_mm",
-            "DR": "rainfall_duration_minutes",
-            "DD": "wind_direction_degrees",
-            "FF": "wind_speed_ms",
-            "FX": "wind_gust_ms",
-            "FH": "wind_speed_hourly_ms",
-            "Q": "solar_radiation_jcm2",
-            "SQ": "sunshine_duration_minutes",
-            "VV": "visibility_m",
-            "N": "cloud_cover_octas",
-            "WW": "weather_code",
-            "EE": "evaporation_mm",
-            "IX": "radiation_index",
-        }
-
         # Select and rename columns that exist in Bronze
-        silver_df = pd.DataFrame()
-
-        for bronze_col, silver_col in column_mapping.items():
-            if bronze_col in df.columns:
-                silver_df[silver_col] = df[bronze_col]
+        bronze_schema = df.collect_schema()
+        silver_columns = []
+
+        for bronze_col, silver_col in self.COLUMN_MAPPING.items():
+            if bronze_col in bronze_schema:
+                column = pl.col(bronze_col)
+                if bronze_schema[bronze_col] == pl.Float32:
+                    # NaN counts as missing, like pandas' isna(); float32
+                    # values are widened and rounded to the measurement
+                    # precision, so 34.9 stays 34.9 rather than 34.900001525878906
+                    column = column.fill_nan(None).cast(pl.Float64).round(self.MEASUREMENT_DECIMALS)
+                elif bronze_schema[bronze_col] == pl.Float64:
+                    column = column.fill_nan(None)
             elif silver_col in self.SILVER_SCHEMA:
                 # Column doesn't exist in Bronze, add as NULL
-                silver_df[silver_col] = pd.NA
+                column = pl.lit(None)
+            else:
+                continue
 
-        return silver_df
+            # Enforce the Silver dtype, whatever type the Bronze year inferred
+            dtype = self.POLARS_DTYPES.get(self.SILVER_SCHEMA.get(silver_col))
+            if dtype is not None:
+                column = column.cast(dtype)
+            silver_columns.append(column.alias(silver_col))
+
+        return df.select(silver_columns)
 
     def apply_data_quality(self, df):
         """Apply data quality checks and add quality flags"""
-
-        # Initialize quality columns
-        df["quality_score"] = 1.0  # Perfect score = 1.0
-        df["quality_flags"] = ""
-        df["has_missing_values"] = False
-        df["has_outliers"] = False
+        schema = df.collect_schema()
 
         # Check for missing values (only for columns that exist!)
-        existing_data_columns = [col for col in self.SILVER_SCHEMA.keys() if col in df.columns]
-        missing_mask = df[existing_data_columns].isna().any(axis=1)
-        df.loc[missing_mask, "has_missing_values"] = True
-        df.loc[missing_mask, "quality_score"] -= 0.2
+        existing_data_columns = [col for col in self.SILVER_SCHEMA.keys() if col in schema]
+        has_missing_values = pl.any_horizontal(
+            [pl.col(col).is_null() for col in existing_data_columns]
+        )
+
+        # Perfect score = 1.0, penalties are subtracted in the order applied
+        quality_score = pl.lit(1.0) - pl.when(has_missing_values).then(0.2).otherwise(0.0)
+        has_outliers = pl.lit(False)
+        quality_flags = []
 
         # Check for outliers
         for column, (min_val, max_val) in self.THRESHOLDS.items():
-            if column in df.columns:
-                outlier_mask = (df[column] < min_val) | (df[column] > max_val)
-                if outlier_mask.any():
-                    df.loc[outlier_mask, "has_outliers"] = True
-                    df.loc[outlier_mask, "quality_score"] -= 0.3
-
-                    # Add to quality flags
-                    df.loc[outlier_mask, "quality_flags"] += f"{column}_outlier;"
+            if column in schema:
+                outlier_mask = ((pl.col(column) < min_val) | (pl.col(column) > max_val)).fill_null(False)
+                has_outliers = has_outliers | outlier_mask
+                quality_score = quality_score - pl.when(outlier_mask).then(0.3).otherwise(0.0)
+
+                # Add to quality flags
+                quality_flags.append(pl.when(outlier_mask).then(pl.lit(f"{column}_outlier;")).otherwise(pl.lit("")))
+
+        # All quality columns are computed in one with_columns context; its
+        # expressions all read the input columns, so the outlier checks above
+        # still see the raw rainfall values
+        quality_columns = [
+            # Ensure quality_score doesn't go negative
+            quality_score.clip(lower_bound=0.0).alias("quality_score"),
+            (pl.concat_str(quality_flags) if quality_flags else pl.lit("")).alias("quality_flags"),
+            has_missing_values.alias("has_missing_values"),
+            has_outliers.alias("has_outliers")
+        ]
 
         # Handle special values
         # Rainfall: -1 means < 0.05mm, convert to 0.0
-        if "rainfall_mm" in df.columns:
-            df.loc[df["rainfall_mm"] == -1, "rainfall_mm"] = 0.0
+        if "rainfall_mm" in schema:
+            quality_columns.append(
+                pl.when(pl.col("rainfall_mm") == -1)
+                .then(pl.lit(0.0))
+                .otherwise(pl.col("rainfall_mm"))
+                .cast(schema["rainfall_mm"])
+                .alias("rainfall_mm")
+            )
 
-        # Ensure quality_score doesn't go negative
-        df["quality_score"] = df["quality_score"].clip(lower=0.0)
+        df = df.with_columns(quality_columns)
 
         return df
 
     def add_metadata(self, df):
         """Add Silver layer metadata"""
-        df["_processed_timestamp"] = pd.Timestamp.now(tz='UTC')
-        df["_bronze_to_silver_version"] = "1.0"
-        return df
-
-    def transform_file(self, parquet_path):
-        """Transform a single Bronze Refined Parquet file"""
-        print(f"  Reading: {parquet_path.name}")
+        return df.with_columns(
+            pl.lit(datetime.now(timezone.utc)).alias("_processed_timestamp"),
+            pl.lit("1.0").alias("_bronze_to_silver_version")
+        )
 
-        # Read Bronze Refined
-        df = pd.read_parquet(parquet_path)
+    def transform_files(self, parquet_paths):
+        """
+        Transform Bronze Refined files to Silver
 
-        if df.empty:
-            print(f"    [WARN] Empty file, skipping")
-            return None
+        Files whose mapped schema matches run as one Polars plan over all of
+        them, instead of one plan and one collect per monthly file. Rows are
+        tagged with their file's index, so duplicates are removed and rows
+        sorted within each file exactly as a per-file run would.
 
-        original_rows = len(df)
+        Returns:
+            One entry per path: (DataFrame, original row count), with None
+            as the DataFrame for an empty file, or the exception it raised
+        """
+        results = [None] * len(parquet_paths)
+        groups = {}
 
         # 1. Map to Silver schema (enforce fixed schema!)
-        df = self.map_bronze_to_silver_schema(df)
+        for i, parquet_path in enumerate(parquet_paths):
+            try:
+                lf = self.map_bronze_to_silver_schema(pl.scan_parquet(parquet_path))
+                lf = lf.with_columns(pl.lit(i, dtype=pl.UInt32).alias("_file"))
+                groups.setdefault(tuple(lf.collect_schema().items()), []).append((i, lf))
+            except Exception as e:
+                results[i] = e
+
+        for plans in groups.values():
+            try:
+                self.collect_group(plans, results)
+            except Exception:
+                # Retry file by file, so one bad file does not fail its group
+                for plan in plans:
+                    try:
+                        self.collect_group([plan], results)
+                    except Exception as e:
+                        results[plan[0]] = e
+
+        return results
+
+    def collect_group(self, plans, results):
+        """Run one plan over a group of mapped files, storing each file's result"""
+        lf = pl.concat([lf for _, lf in plans], how="vertical")
+
+        # Row counts per file, before duplicates are removed
+        counts = lf.group_by("_file").len()
 
         # 2. Apply data quality checks
-        df = self.apply_data_quality(df)
+        lf = self.apply_data_quality(lf)
 
         # 3. Remove duplicates
-        df = df.drop_duplicates(subset=["timestamp", "station_id"], keep="first")
-        duplicates_removed = original_rows - len(df)
+        lf = lf.unique(subset=["_file", "timestamp", "station_id"], keep="first", maintain_order=True)
 
         # 4. Add metadata
-        df = self.add_metadata(df)
-
-        # 5. Sort by timestamp
-        df = df.sort_values("timestamp").reset_index(drop=True)
-
-        # Report quality stats
+        lf = self.add_metadata(lf)
+
+        # 5. Sort by timestamp; the streaming engine processes the files in
+        # batches rather than materializing every step in full
+        lf = lf.sort(["_file", "timestamp"], maintain_order=True)
+        df, counts = pl.collect_all([lf, counts], engine="streaming")
+
+        # Rows are sorted by file, so each file's rows are one contiguous,
+        # zero-copy slice of the frame
+        frames = {}
+        offset = 0
+        rows = df.drop("_file")
+        for run in df["_file"].rle().to_list():
+            frames[run["value"]] = rows.slice(offset, run["len"])
+            offset += run["len"]
+
+        original_rows = dict(counts.iter_rows())
+        for i, _ in plans:
+            results[i] = (frames.get(i), original_rows.get(i, 0))
+
+    def report_quality(self, df, original_rows):
+        """Print row and quality statistics of one transformed file"""
+        duplicates_removed = original_rows - len(df)
         avg_quality = df["quality_score"].mean()
         missing_pct = (df["has_missing_values"].sum() / len(df)) * 100
         outlier_pct = (df["has_outliers"].sum() / len(df)) * 100
@@ -199,8 +294,6 @@ class SilverTransformer:
         print(f"    [OK] {len(df)} rows (removed {duplicates_removed} duplicates)")
         print(f"    Quality: {avg_quality:.2f} avg | {missing_pct:.1f}% missing | {outlier_pct:.1f}% outliers")
 
-        return df
-
     def get_output_path(self, parquet_path):
         """Generate output path for Silver Parquet file"""
         # Extract date info from Bronze path
@@ -211,10 +304,9 @@ class SilverTransformer:
         year = year_part.split("=")[1]
         month = month_part.split("=")[1]
 
-        # Create directory structure (same partitioning as Bronze)
-        station_dir = self.station_id.replace('-', '_')
-        output_dir = SILVER_DIR / "weather_observations" / f"station_id={station_dir}" / f"year={year}" / f"month={month}"
-        output_dir.mkdir(parents=True, exist_ok=True)
+        # Directory structure (same partitioning as Bronze); created when the
+        # file is written
+        output_dir = self.silver_dir / f"year={year}" / f"month={month}"
 
         # Output filename
         output_file = output_dir / parquet_path.name
@@ -245,20 +337,33 @@ class SilverTransformer:
         transformed = 0
         total_rows = 0
 
-        # Transform each file
-        for i, parquet_path in enumerate(parquet_files, 1):
+        # Transform all files of the station at once
+        results = self.transform_files(parquet_files)
+
+        # Save each file
+        for i, (parquet_path, result) in enumerate(zip(parquet_files, results), 1):
             print(f"[{i}/{len(parquet_files)}] {parquet_path.parent.name}/{parquet_path.name}")
 
             try:
-                # Transform to Silver
-                df = self.transform_file(parquet_path)
+                if isinstance(result, Exception):
+                    raise result
 
-                if df is None or df.empty:
+                df, original_rows = result
+                if df is None or df.is_empty():
+                    print(f"    [WARN] Empty file, skipping")
                     continue
+                self.report_quality(df, original_rows)
 
                 # Save to Silver
                 output_path = self.get_output_path(parquet_path)
-                df.to_parquet(output_path, index=False, engine='pyarrow')
+                df.write_parquet(
+                    output_path,
+                    compression="zstd",
+                    compression_level=3,
+                    statistics=True,
+                    data_page_size=PARQUET_DATA_PAGE_SIZE,
+                    mkdir=True
+                )
 
                 file_size = os.path.getsize(output_path)
                 print(f"    [SUCCESS] Saved {file_size:,} bytes\n")